@@ -3,15 +3,19 @@ import time
 
 import config
 from pipeline.analyzer import FraudAnalyzer
-from pipeline.rag import RAGEngine
-from monitor.network import get_network_status, get_bytes_transferred
+from pipeline.warmup import RAGWarmup
+from monitor.network import get_bytes_transferred
+from monitor.sampler import get_sampler
 
 
 @st.cache_resource
 def load_rag_engine():
-    engine = RAGEngine()
-    engine.build_index()
-    return engine
+    return RAGWarmup().start()
+
+
+@st.cache_resource
+def load_network_sampler():
+    return get_sampler()
 
 
 @st.cache_resource
@@ -87,9 +91,24 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-with st.spinner("Loading SHIELD models (first time only)..."):
-    rag_engine = load_rag_engine()
-    analyzer = load_analyzer()
+rag_engine = load_rag_engine()
+analyzer = load_analyzer()
+
+if not config.RAG_BACKGROUND_WARMUP and not rag_engine.ready:
+    with st.spinner("Loading SHIELD models (first time only)..."):
+        rag_engine.wait()
+
+with st.sidebar:
+    st.markdown("### Knowledge Base")
+    if rag_engine.ready:
+        st.success(f"RAG ready ({rag_engine.elapsed:.1f}s warm-up)")
+    elif rag_engine.status == "failed":
+        st.error(f"RAG unavailable: {rag_engine.error}")
+        st.caption("Analyses run on tools only.")
+    else:
+        st.info("Loading embedding model and index...")
+        st.caption("Analyses run on tools only until the knowledge base is ready.")
+        st.button("Refresh status")
 
 
 st.markdown(f'<p class="main-header">{config.APP_ICON} {config.APP_TITLE}</p>', unsafe_allow_html=True)
@@ -101,7 +120,8 @@ col_main, col_monitor = st.columns([3, 1])
 with col_monitor:
     st.markdown("### Network Monitor")
 
-    net_status = get_network_status()
+    sampler = load_network_sampler()
+    net_status = sampler.status()
 
     if net_status["status"] == "SECURE":
         st.markdown(
@@ -113,10 +133,29 @@ with col_monitor:
             '</div>',
             unsafe_allow_html=True,
         )
+    elif net_status["status"] == "UNKNOWN":
+        st.warning(f"❔ {net_status['summary']}")
     else:
         st.error(f"⚠️ {net_status['summary']}")
 
     st.caption(f"Total connections: {net_status['total_established']}")
+    if net_status["pending_lookups"]:
+        st.caption(f"Resolving {net_status['pending_lookups']} host(s)...")
+    history = sampler.history()
+    if len(history) > 1:
+        st.caption(f"Last {len(history) * sampler.interval:.0f}s")
+        st.line_chart(
+            {
+                "sent KB": [s["bytes_sent_delta"] / 1024 for s in history],
+                "recv KB": [s["bytes_recv_delta"] / 1024 for s in history],
+            },
+            height=140,
+        )
+        st.line_chart(
+            {"connections": [s["total_established"] for s in history]},
+            height=100,
+        )
+
     st.caption(f"Model: {config.LLM_MODEL}")
     st.caption(f"Provider: {config.LLM_PROVIDER}")
 
@@ -140,70 +179,93 @@ with col_main:
         analyze_btn = st.button("🔍 Analyze", type="primary", use_container_width=True)
 
     if analyze_btn and message.strip():
-        with st.spinner("Analyzing message..."):
-            start_time = time.time()
-
-            result = analyzer.analyze(
-                message.strip(),
-                sender_id.strip() if sender_id.strip() else None,
-            )
-
-            elapsed = time.time() - start_time
+        start_time = time.time()
+        first_output = None
+        llm_text = ""
+        result = None
 
         st.markdown("---")
-
-        risk = result["combined_tool_risk"]
-        if risk >= 80:
-            risk_class = "risk-critical"
-            risk_label = "CRITICAL RISK"
-        elif risk >= 50:
-            risk_class = "risk-high"
-            risk_label = "HIGH RISK"
-        elif risk >= 25:
-            risk_class = "risk-medium"
-            risk_label = "MEDIUM RISK"
-        else:
-            risk_class = "risk-low"
-            risk_label = "LOW RISK"
-
-        st.markdown(
-            f'<div class="{risk_class}">'
-            f'{risk_label} — Tool Score: {risk}/100'
-            f'</div>',
-            unsafe_allow_html=True,
-        )
-
+        verdict_box = st.empty()
         st.markdown("<br>", unsafe_allow_html=True)
-
         col_url, col_sender_r, col_urgency = st.columns(3)
-
-        url_data = result["tool_results"]["url_analysis"]
-        sender_data = result["tool_results"]["sender_verification"]
-        urgency_data = result["tool_results"]["urgency_analysis"]
-
-        with col_url:
-            st.metric("URL Risk", f"{url_data['overall_risk']}/100")
-            if url_data["urls_found"] > 0:
-                st.caption(url_data["summary"])
-
-        with col_sender_r:
-            st.metric("Sender Risk", f"{sender_data['risk_score']}/100")
-            st.caption(sender_data["summary"][:80])
-
-        with col_urgency:
-            st.metric("Urgency Level", urgency_data["level"])
-            if urgency_data["pin_otp_requested"]:
-                st.error("PIN/OTP REQUESTED — ALWAYS FRAUD")
-
         st.markdown("### AI Analysis")
-        st.markdown(result["llm_analysis"])
+        sources_box = st.empty()
+        analysis_box = st.empty()
+        analysis_box.info("Analyzing message...")
+
+        for event in analyzer.analyze_stream(
+            message.strip(),
+            sender_id.strip() if sender_id.strip() else None,
+        ):
+            if event["type"] == "tools":
+                first_output = time.time() - start_time
+
+                risk = event["combined_tool_risk"]
+                if risk >= 80:
+                    risk_class = "risk-critical"
+                    risk_label = "CRITICAL RISK"
+                elif risk >= 50:
+                    risk_class = "risk-high"
+                    risk_label = "HIGH RISK"
+                elif risk >= 25:
+                    risk_class = "risk-medium"
+                    risk_label = "MEDIUM RISK"
+                else:
+                    risk_class = "risk-low"
+                    risk_label = "LOW RISK"
+
+                verdict_box.markdown(
+                    f'<div class="{risk_class}">'
+                    f'{risk_label} — Tool Score: {risk}/100'
+                    f'</div>',
+                    unsafe_allow_html=True,
+                )
+
+                url_data = event["tool_results"]["url_analysis"]
+                sender_data = event["tool_results"]["sender_verification"]
+                urgency_data = event["tool_results"]["urgency_analysis"]
+
+                with col_url:
+                    st.metric("URL Risk", f"{url_data['overall_risk']}/100")
+                    if url_data["urls_found"] > 0:
+                        st.caption(url_data["summary"])
+
+                with col_sender_r:
+                    st.metric("Sender Risk", f"{sender_data['risk_score']}/100")
+                    st.caption(sender_data["summary"][:80])
+
+                with col_urgency:
+                    st.metric("Urgency Level", urgency_data["level"])
+                    if urgency_data["pin_otp_requested"]:
+                        st.error("PIN/OTP REQUESTED — ALWAYS FRAUD")
+
+            elif event["type"] == "rag":
+                if event["sources"]:
+                    sources_box.caption(f"Matched patterns: {', '.join(event['sources'])}")
+
+            elif event["type"] == "token":
+                llm_text += event["text"]
+                analysis_box.markdown(llm_text)
+
+            elif event["type"] == "done":
+                result = event["result"]
+
+        elapsed = time.time() - start_time
+        analysis_box.markdown(result["llm_analysis"])
 
         with st.expander("Technical Details"):
             st.json({
                 "model": result["model_used"],
+                "fast_path": result["fast_path"],
+                "degraded": result["degraded"],
+                "cache_hit": result["cache_hit"],
+                "rag_ready": result["rag_ready"],
                 "cloud_connections": result["cloud_connections"],
+                "network": result["network"],
                 "rag_sources": result["rag_sources"],
+                "tool_verdict_time": f"{first_output * 1000:.0f}ms",
                 "analysis_time": f"{elapsed:.2f}s",
+                "stage_timings_ms": result["timings"],
                 "url_details": url_data,
                 "sender_details": sender_data,
                 "urgency_details": {
@@ -0,0 +1 @@
+__all__ = ["cold_start", "generator", "mock_llm", "run"]
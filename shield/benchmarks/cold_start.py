@@ -0,0 +1,82 @@
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+SHIELD_DIR = Path(__file__).resolve().parent.parent
+
+SAMPLE_MESSAGE = (
+    "Dear SBI customer, your account will be blocked in 24hrs. "
+    "Update KYC immediately: http://bit.ly/sbi-kyc-update"
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+mode = sys.argv[1]
+
+import config
+config.VERDICT_CACHE_ENABLED = False
+from pipeline.analyzer import FraudAnalyzer
+from pipeline.warmup import RAGWarmup
+imported = time.perf_counter()
+
+rag = RAGWarmup().start()
+if mode == "eager":
+    rag.wait()
+analyzer = FraudAnalyzer(rag_engine=rag)
+ready_to_serve = time.perf_counter()
+
+stream = analyzer.analyze_stream(sys.argv[2])
+event = next(stream)
+first_verdict = time.perf_counter()
+stream.close()
+assert event["type"] == "tools"
+
+rag_ready = rag.wait()
+print(json.dumps({
+    "mode": mode,
+    "import_s": imported - started,
+    "ready_to_serve_s": ready_to_serve - started,
+    "first_verdict_s": first_verdict - started,
+    "first_verdict_risk": event["combined_tool_risk"],
+    "rag_status": rag.status,
+    "rag_ready_s": time.perf_counter() - started if rag_ready else None,
+}))
+"""
+
+
+def run_probe(mode: str, message: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode, message],
+        cwd=SHIELD_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(repeats: int, message: str) -> dict:
+    report = {}
+    for mode in ("lazy", "eager"):
+        runs = [run_probe(mode, message) for _ in range(repeats)]
+        report[mode] = {
+            "runs": runs,
+            "first_verdict_s_min": min(r["first_verdict_s"] for r in runs),
+            "ready_to_serve_s_min": min(r["ready_to_serve_s"] for r in runs),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure SHIELD cold start to first verdict")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--message", default=SAMPLE_MESSAGE)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = run(args.repeats, args.message)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
@@ -0,0 +1,95 @@
+import random
+import re
+from pathlib import Path
+from typing import Iterator, Optional
+
+import config
+
+
+_QUOTE_RE = re.compile(r'"([A-Z\[][^"\n]{29,})"')
+_PLACEHOLDER_RE = re.compile(r'\[([^\]]+)\]')
+_AMOUNT_RE = re.compile(r'\bRs\.? ?X\b')
+
+BANKS = ["SBI", "HDFC", "ICICI", "Axis", "Kotak", "PNB", "Paytm", "PhonePe"]
+
+LINKS = [
+    "http://bit.ly/{bank}-kyc-update",
+    "https://{bank}-secure-login.xyz/verify",
+    "http://192.168.45.12/{bank}-login",
+    "https://www.{bank}-rewards.top/claim/prize",
+    "https://onlinesbi.sbi",
+    "https://www.hdfcbank.com",
+    "tinyurl.com/{bank}refund",
+]
+
+SENDER_IDS = [
+    None, None, "SBIBNK", "HDFCBK", "ICICIB", "AXISBK", "PAYTMB",
+    "SB1BNK", "HDFCAL", "1CICIB", "AMZN01", "VM-SBIINB",
+]
+
+LEGITIMATE_TEMPLATES = [
+    "Your a/c no. XXXXXXX{acct} is credited by Rs.{amount}.00 on 21-Feb-26. Avl Bal Rs.{balance}.50 -{bank}",
+    "Rs.{amount} debited from A/c XX{acct} on 03-Mar-26 to VPA merchant@{bank_lower}. Not you? Call 1800-425-3800 -{bank}",
+    "{otp} is your OTP for txn of Rs {amount} at AMAZON. Valid for 10 mins. Do not share with anyone. -{bank}",
+    "Dear Customer, your {bank} credit card statement is ready. Total due Rs {amount}. Pay via the official app.",
+]
+
+
+class MessageGenerator:
+    def __init__(self, seed: int = 0, scam_ratio: float = 0.7, knowledge_base_dir: str = None):
+        self.random = random.Random(seed)
+        self.scam_ratio = scam_ratio
+        self.templates = load_templates(knowledge_base_dir or config.KNOWLEDGE_BASE_DIR)
+        if not self.templates:
+            raise ValueError("No scam templates found in the knowledge base")
+
+    def message(self) -> tuple[str, Optional[str]]:
+        rnd = self.random
+        bank = rnd.choice(BANKS)
+        if rnd.random() < self.scam_ratio:
+            text = self._fill(rnd.choice(self.templates), bank)
+        else:
+            text = rnd.choice(LEGITIMATE_TEMPLATES).format(
+                acct=rnd.randint(1000, 9999),
+                amount=f"{rnd.randint(1, 99)},{rnd.randint(100, 999)}",
+                balance=f"{rnd.randint(1, 99)},{rnd.randint(100, 999)}",
+                otp=rnd.randint(100000, 999999),
+                bank=bank.upper(),
+                bank_lower=bank.lower(),
+            )
+        return text, rnd.choice(SENDER_IDS)
+
+    def generate(self, count: int) -> Iterator[tuple[str, Optional[str]]]:
+        for _ in range(count):
+            yield self.message()
+
+    def _fill(self, template: str, bank: str) -> str:
+        rnd = self.random
+
+        def placeholder(match: re.Match) -> str:
+            name = match.group(1).lower()
+            if "link" in name or "url" in name:
+                return rnd.choice(LINKS).format(bank=bank.lower())
+            if "bank" in name:
+                return bank
+            return rnd.choice(["Jio", "Reliance", "Tata", "Flipkart"])
+
+        text = _PLACEHOLDER_RE.sub(placeholder, template)
+        text = _AMOUNT_RE.sub(lambda _: f"Rs {rnd.randint(1, 50) * 1000}", text)
+        if rnd.random() < 0.3 and "http" not in text:
+            text += " " + rnd.choice(LINKS).format(bank=bank.lower())
+        return text
+
+
+def load_templates(knowledge_base_dir: str) -> list[str]:
+    templates = []
+    for path in sorted(Path(knowledge_base_dir, "scam_patterns").glob("*.md")):
+        templates.extend(_QUOTE_RE.findall(path.read_text(encoding="utf-8")))
+    return templates
+
+
+if __name__ == "__main__":
+    generator = MessageGenerator(seed=42)
+    print(f"Loaded {len(generator.templates)} templates")
+    for text, sender_id in generator.generate(8):
+        print(f"[{sender_id or '-'}] {text}")
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MOCK_VERDICT = """RISK SCORE: 90%
+FRAUD CATEGORY: Phishing SMS
+CONFIDENCE: High
+
+RED FLAGS:
+- Suspicious link
+- Pressure to act immediately
+
+EXPLANATION:
+This is a mock verdict from the benchmark LLM server.
+
+RECOMMENDED ACTION:
+Do not click the link."""
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    token_latency = 0.0
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        time.sleep(self.latency)
+        model = body.get("model", "mock")
+        if body.get("stream"):
+            self._stream(model)
+            return
+
+        self._send_json({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": MOCK_VERDICT},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+    def _stream(self, model: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for token in MOCK_VERDICT.split(" "):
+            time.sleep(self.token_latency)
+            self._event({
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token + " "}, "finish_reason": None}],
+            })
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _event(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, payload: dict, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, token_latency: float = 0.0):
+    handler = type("Handler", (MockLLMHandler,), {"latency": latency, "token_latency": token_latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="shield-mock-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    server, base_url = start_mock_server(port=11434)
+    print(f"Mock OpenAI-compatible server on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
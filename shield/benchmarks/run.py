@@ -0,0 +1,223 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+import config
+from benchmarks.generator import MessageGenerator
+from benchmarks.mock_llm import start_mock_server
+
+
+STAGES = ["analyze_urls", "verify_sender", "classify_urgency", "score_batch", "rag_retrieve", "rag_build_index", "analyze"]
+
+
+def measure(fn: Callable, inputs: Iterable[tuple], warmup: int = 0) -> dict:
+    inputs = list(inputs)
+    for args in inputs[:warmup]:
+        fn(*args)
+
+    latencies = []
+    started = time.perf_counter()
+    for args in inputs:
+        call_started = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed)
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(_percentile(ordered, 50), 4),
+        "p90_ms": round(_percentile(ordered, 90), 4),
+        "p99_ms": round(_percentile(ordered, 99), 4),
+        "max_ms": round(ordered[-1], 4),
+        "throughput_per_s": round(len(ordered) / elapsed, 2) if elapsed else None,
+    }
+
+
+def bench_tools(samples: list[tuple], warmup: int) -> dict:
+    from tools.sender_verifier import verify_sender
+    from tools.urgency_classifier import classify_urgency
+    from tools.url_analyzer import analyze_urls
+
+    return {
+        "analyze_urls": measure(analyze_urls, [(m,) for m, _ in samples], warmup),
+        "verify_sender": measure(verify_sender, samples, warmup),
+        "classify_urgency": measure(classify_urgency, [(m,) for m, _ in samples], warmup),
+    }
+
+
+def bench_score_batch(samples: list[tuple], batch_size: int = 1000) -> dict:
+    from tools.batch_scorer import score_batch
+
+    batches = [samples[i:i + batch_size] for i in range(0, len(samples), batch_size)]
+    latencies = []
+    started = time.perf_counter()
+    for batch in batches:
+        call_started = time.perf_counter()
+        score_batch([m for m, _ in batch], [s for _, s in batch])
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, elapsed)
+    result["batch_size"] = batch_size
+    result["messages_per_s"] = round(len(samples) / elapsed, 2) if elapsed else None
+    return result
+
+
+def bench_rag(samples: list[tuple], queries: int, warmup: int) -> dict:
+    from pipeline.rag import RAGEngine
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        config.VECTOR_STORE_DIR = store_dir
+        config.MATRIX_STORE_DIR = str(Path(store_dir, "matrix"))
+
+        started = time.perf_counter()
+        engine = RAGEngine()
+        engine.build_index(force_rebuild=True)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        retrieve = measure(engine.retrieve, [(m,) for m, _ in samples[:queries]], warmup)
+        retrieve["backend"] = engine.backend
+        retrieve["mode"] = engine.mode
+        retrieve["embedding_cache"] = engine.cache_stats()
+
+    return {
+        "rag_build_index": {"calls": 1, "cold_ms": round(build_ms, 2), "backend": engine.backend, "mode": engine.mode},
+        "rag_retrieve": retrieve,
+    }
+
+
+def bench_analyze(samples: list[tuple], calls: int, warmup: int, llm_latency: float) -> dict:
+    from pipeline.analyzer import FraudAnalyzer
+
+    server, base_url = start_mock_server(latency=llm_latency)
+    config.LLM_BASE_URL = base_url
+    try:
+        analyzer = FraudAnalyzer(fast_path=False)
+        result = measure(analyzer.analyze, samples[:calls], warmup)
+        result["llm_latency_ms"] = llm_latency * 1000
+        return result
+    finally:
+        server.shutdown()
+
+
+def run(
+    count: int = 2000,
+    seed: int = 42,
+    queries: int = 200,
+    analyze_calls: int = 200,
+    warmup: int = 20,
+    llm_latency: float = 0.0,
+    stages: list[str] = None,
+) -> dict:
+    config.VERDICT_CACHE_ENABLED = False
+    stages = stages or STAGES
+    samples = list(MessageGenerator(seed=seed).generate(count))
+
+    results = {}
+    skipped = {}
+
+    if {"analyze_urls", "verify_sender", "classify_urgency"} & set(stages):
+        results.update({k: v for k, v in bench_tools(samples, warmup).items() if k in stages})
+    if "score_batch" in stages:
+        results["score_batch"] = bench_score_batch(samples)
+
+    if {"rag_retrieve", "rag_build_index"} & set(stages):
+        try:
+            results.update({k: v for k, v in bench_rag(samples, queries, warmup).items() if k in stages})
+        except ImportError as e:
+            skipped["rag_retrieve"] = skipped["rag_build_index"] = f"RAG dependencies not installed: {e}"
+
+    if "analyze" in stages:
+        results["analyze"] = bench_analyze(samples, analyze_calls, warmup, llm_latency)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "messages": count,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[str]:
+    lines = []
+    for stage, now in current["results"].items():
+        before = baseline.get("results", {}).get(stage)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p99_ms", "cold_ms"):
+            if metric not in now or not before.get(metric):
+                continue
+            change = now[metric] / before[metric] - 1
+            flag = "REGRESSION" if change > threshold else "ok"
+            lines.append(f"{stage:18} {metric:8} {before[metric]:>10.3f} -> {now[metric]:>10.3f} ({change:+.1%}) {flag}")
+    return lines
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SHIELD latency/throughput benchmarks")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=200, help="RAG retrieve calls")
+    parser.add_argument("--analyze-calls", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="delay added by the mock LLM server")
+    parser.add_argument("--stages", nargs="+", choices=STAGES)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    report = run(
+        count=args.messages,
+        seed=args.seed,
+        queries=args.queries,
+        analyze_calls=args.analyze_calls,
+        warmup=args.warmup,
+        llm_latency=args.llm_latency_ms / 1000,
+        stages=args.stages,
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print("\n".join(compare(baseline, report)))
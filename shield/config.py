@@ -24,14 +24,56 @@ STT_MODEL = "whisper-large-v3-turbo"
 
 KNOWLEDGE_BASE_DIR = "knowledge_base"
 VECTOR_STORE_DIR = "vector_store"
+MATRIX_STORE_DIR = "vector_store/matrix"
+DOMAIN_ALLOWLIST_PATH = "data/official_domains.csv"
+SENDER_REGISTRY_PATH = "data/sender_registry.json"
+SENDER_REGISTRY_RELOAD_INTERVAL = 5
 
 EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
 
 RAG_TOP_K = 5
+RAG_QUERY_CACHE_SIZE = 1024
+RAG_BACKEND = "llamaindex"
+RAG_RETRIEVAL_MODE = "hybrid"
+RAG_HYBRID_DEPTH = 2
+RAG_BACKGROUND_WARMUP = True
+RAG_WARMUP_QUERY = "share your otp to verify your account"
+MATRIX_STORE_DTYPE = "float32"
 
 
 LLM_TEMPERATURE = 0.2      
 LLM_MAX_TOKENS = 500       
+LLM_MAX_CONCURRENCY = 4
+LLM_REQUEST_DEADLINE = 60
+LLM_CONNECT_TIMEOUT = 2.0
+LLM_RETRY_ATTEMPTS = 2
+LLM_RETRY_BACKOFF = 0.2
+LLM_RETRY_BACKOFF_MAX = 2.0
+LLM_POOL_CONNECTIONS = 8
+LLM_POOL_KEEPALIVE = 8
+LLM_KEEPALIVE_EXPIRY = 60
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_RESET = 30
+STAGE_WORKERS = 8
+
+FAST_PATH_ENABLED = False
+
+VERDICT_CACHE_ENABLED = True
+VERDICT_CACHE_VERSION = "4"
+VERDICT_CACHE_SIZE = 10000
+VERDICT_CACHE_TTL = 24 * 60 * 60
+VERDICT_CACHE_PATH = None
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_WORKERS = 8
+SERVER_QUEUE_SIZE = 64
+SERVER_BATCH_MAX = 256
+SERVER_MAX_BODY_BYTES = 1024 * 1024
+SERVER_REQUEST_TIMEOUT = 120
+
+SCANNER_CHUNK_SIZE = 500
+SCANNER_WORKERS = None
 SUPPORTED_LANGUAGES = ["english", "hindi", "telugu"]
 
 
@@ -40,6 +82,16 @@ APP_ICON = "🛡️"
 APP_TAGLINE = "On-Device AI Fraud Detection for Indian UPI Users"
 
 NETWORK_MONITOR_INTERVAL = 2
+NETWORK_HISTORY_SIZE = 150
+LOCAL_LLM_PORTS = (11434, 8000, 8080)
+PROCESS_MONITOR_ENABLED = True
+PROCESS_TREE_REFRESH = 5
+
+DNS_CACHE_TTL = 600
+DNS_NEGATIVE_TTL = 60
+DNS_CACHE_SIZE = 4096
+DNS_LOOKUP_WORKERS = 8
+DNS_LOOKUP_BUDGET = 0.15
 
 
 CLOUD_AI_ENDPOINTS = [
@@ -52,3 +104,5 @@ CLOUD_AI_ENDPOINTS = [
     "api.mistral.ai",
     "api.replicate.com",
 ]
+CLOUD_AI_RANGES_PATH = "data/cloud_ai_ranges.json"
+CLOUD_AI_RANGES_RELOAD_INTERVAL = 30
@@ -1 +1 @@
-__all__ = ["network"]
+__all__ = ["network", "resolver", "sampler", "process", "cidr_index"]
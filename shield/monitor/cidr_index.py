@@ -0,0 +1,210 @@
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import config
+
+
+class CidrIndex:
+    __slots__ = ("_roots", "_count")
+
+    def __init__(self):
+        self._roots = {4: [None, None, None], 6: [None, None, None]}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, cidr: str, value: Any) -> None:
+        network = ipaddress.ip_network(cidr, strict=False)
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+
+        node = self._roots[network.version]
+        for depth in range(network.prefixlen):
+            bit = (bits >> (width - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+
+        if node[2] is None:
+            self._count += 1
+        node[2] = value
+
+    def lookup(self, ip: str) -> Optional[Any]:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+
+        bits = int(address)
+        width = address.max_prefixlen
+        node = self._roots[address.version]
+        match = node[2]
+        for depth in range(width):
+            node = node[(bits >> (width - 1 - depth)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                match = node[2]
+        return match
+
+    def __contains__(self, ip: str) -> bool:
+        return self.lookup(ip) is not None
+
+
+class CloudRanges:
+    __slots__ = ("version", "providers", "index", "uncovered")
+
+    def __init__(self, version: str, providers: dict):
+        self.version = version
+        self.providers = providers
+        self.index = CidrIndex()
+        self.uncovered = []
+        for name, info in providers.items():
+            cidrs = (*info.get("cidrs", []), *info.get("resolved", []))
+            if not cidrs:
+                self.uncovered.append(name)
+            for cidr in cidrs:
+                self.index.add(cidr, name)
+
+    def classify(self, ip: str) -> Optional[str]:
+        return self.index.lookup(ip)
+
+
+def load_cloud_ranges(path: str) -> CloudRanges:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return CloudRanges(data["version"], data["providers"])
+
+
+def refresh_cloud_ranges(path: str, endpoints: list[str] = None) -> dict:
+    if Path(path).exists():
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    else:
+        data = {"version": "", "providers": {}}
+    providers = data["providers"]
+    owners = {
+        endpoint: name
+        for name, info in providers.items()
+        for endpoint in info.get("endpoints", [])
+    }
+
+    resolved = {}
+    for endpoint in endpoints or config.CLOUD_AI_ENDPOINTS:
+        name = owners.get(endpoint, _provider_name(endpoint))
+        info = providers.setdefault(name, {"endpoints": [], "cidrs": [], "resolved": []})
+        if endpoint not in info["endpoints"]:
+            info["endpoints"].append(endpoint)
+        resolved.setdefault(name, set())
+
+        try:
+            addresses = {entry[4][0] for entry in socket.getaddrinfo(endpoint, 443, proto=socket.IPPROTO_TCP)}
+        except OSError as e:
+            print(f"Could not resolve {endpoint}: {e}")
+            continue
+
+        resolved[name].update(str(ipaddress.ip_network(address)) for address in addresses)
+
+    for name, networks in resolved.items():
+        if networks:
+            providers[name]["resolved"] = sorted(networks)
+
+    data["version"] = time.strftime("%Y.%m.%d")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return data
+
+
+def _provider_name(endpoint: str) -> str:
+    return endpoint.split(".")[-2]
+
+
+def _unavailable_ranges() -> CloudRanges:
+    providers = {}
+    for endpoint in config.CLOUD_AI_ENDPOINTS:
+        providers.setdefault(_provider_name(endpoint), {"endpoints": []})["endpoints"].append(endpoint)
+    return CloudRanges("missing", providers)
+
+
+def _resolve(path: str) -> str:
+    return str(Path(__file__).resolve().parent.parent / path)
+
+
+_lock = threading.Lock()
+_ranges: Optional[CloudRanges] = None
+_signature = None
+_last_check = 0.0
+
+
+def get_cloud_ranges() -> CloudRanges:
+    global _last_check
+
+    now = time.monotonic()
+    if _ranges is not None and now - _last_check < config.CLOUD_AI_RANGES_RELOAD_INTERVAL:
+        return _ranges
+
+    with _lock:
+        if _ranges is None or now - _last_check >= config.CLOUD_AI_RANGES_RELOAD_INTERVAL:
+            _last_check = now
+            _reload_if_changed()
+    return _ranges
+
+
+def _reload_if_changed() -> None:
+    global _ranges, _signature
+
+    path = _resolve(config.CLOUD_AI_RANGES_PATH)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if _ranges is None:
+            print(f"Cloud AI ranges not found at {path}, cloud connections cannot be classified")
+            _ranges = _unavailable_ranges()
+        return
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if signature == _signature and _ranges is not None:
+        return
+    _signature = signature
+
+    try:
+        ranges = load_cloud_ranges(path)
+    except Exception as e:
+        if _ranges is None:
+            print(f"Cloud AI ranges at {path} could not be loaded, cloud connections cannot be classified: {e}")
+            _ranges = _unavailable_ranges()
+        else:
+            print(f"Cloud AI ranges reload failed, keeping version {_ranges.version}: {e}")
+        return
+
+    _ranges = ranges
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or refresh the cloud AI IP range file")
+    parser.add_argument("--refresh", action="store_true", help="resolve CLOUD_AI_ENDPOINTS and merge the results")
+    parser.add_argument("ips", nargs="*")
+    args = parser.parse_args()
+
+    if args.refresh:
+        path = _resolve(config.CLOUD_AI_RANGES_PATH)
+        data = refresh_cloud_ranges(path)
+        print(f"Updated {path} to version {data['version']}")
+
+    ranges = get_cloud_ranges()
+    print(f"Version {ranges.version}: {len(ranges.index)} ranges across {len(ranges.providers)} providers")
+    if ranges.uncovered:
+        print(f"No ranges for: {', '.join(ranges.uncovered)} (run with --refresh)")
+    for ip in args.ips or ["160.79.104.10", "8.8.8.8", "127.0.0.1"]:
+        print(f"  {ip}: {ranges.classify(ip) or '-'}")
@@ -1,20 +1,23 @@
+import ipaddress
+
 import psutil
-import socket
 
-import config
+from monitor.cidr_index import get_cloud_ranges
+from monitor.process import get_process_monitor
+from monitor.resolver import PENDING, get_resolver
 
 
 def get_network_status() -> dict:
-    connections = psutil.net_connections(kind='inet')
-    
+    monitor = get_process_monitor()
+    ranges = get_cloud_ranges()
+    connections = monitor.connections()
+
     cloud_hits = []
+    unchecked = set()
     total_established = 0
     local_ai_connections = 0
 
     for conn in connections:
-        if conn.status != 'ESTABLISHED':
-            continue
-        
         total_established += 1
 
         if not conn.raddr:
@@ -23,37 +26,58 @@ def get_network_status() -> dict:
         remote_ip = conn.raddr.ip
         remote_port = conn.raddr.port
 
-        try:
-            remote_host = socket.getfqdn(remote_ip)
-        except Exception:
-            remote_host = remote_ip
-
-        for endpoint in config.CLOUD_AI_ENDPOINTS:
-            if endpoint in remote_host or endpoint in remote_ip:
-                cloud_hits.append({
-                    "endpoint": endpoint,
-                    "ip": remote_ip,
-                    "port": remote_port,
-                })
-
-        if remote_ip in ("127.0.0.1", "::1", "localhost"):
-            if remote_port in (11434, 8000, 8080):
-                local_ai_connections += 1
+        provider = ranges.classify(remote_ip)
+        if provider is not None:
+            cloud_hits.append({
+                "endpoint": _provider_endpoint(ranges, provider),
+                "provider": provider,
+                "ip": remote_ip,
+                "host": remote_ip,
+                "port": remote_port,
+            })
+        elif _is_public(remote_ip):
+            unchecked.add(remote_ip)
+
+        if monitor.is_local_llm(remote_ip, remote_port):
+            local_ai_connections += 1
+
+    remote_hosts = get_resolver().resolve_many(hit["ip"] for hit in cloud_hits)
+    for hit in cloud_hits:
+        if remote_hosts[hit["ip"]] != PENDING:
+            hit["host"] = remote_hosts[hit["ip"]]
+
+    if cloud_hits:
+        status = "WARNING"
+        summary = (
+            f"WARNING: {len(cloud_hits)} cloud AI connection(s) detected! "
+            f"Endpoints: {', '.join(h['endpoint'] for h in cloud_hits)}"
+        )
+    elif unchecked and ranges.uncovered:
+        status = "UNKNOWN"
+        summary = (
+            f"{len(unchecked)} external host(s) could not be checked: no IP ranges for "
+            f"{', '.join(ranges.uncovered)}. Run `python -m monitor.cidr_index --refresh`."
+        )
+    else:
+        status = "SECURE"
+        summary = (
+            f"0 cloud AI connections detected. "
+            f"{local_ai_connections} local AI connection(s) active. "
+            f"All processing is on-device."
+        )
 
     return {
         "cloud_ai_connections": len(cloud_hits),
         "cloud_ai_details": cloud_hits,
         "local_ai_connections": local_ai_connections,
         "total_established": total_established,
-        "status": "SECURE" if len(cloud_hits) == 0 else "WARNING",
-        "summary": (
-            f"0 cloud AI connections detected. "
-            f"{local_ai_connections} local AI connection(s) active. "
-            f"All processing is on-device."
-        ) if len(cloud_hits) == 0 else (
-            f"WARNING: {len(cloud_hits)} cloud AI connection(s) detected! "
-            f"Endpoints: {', '.join(h['endpoint'] for h in cloud_hits)}"
-        ),
+        "unchecked_hosts": len(unchecked) if ranges.uncovered else 0,
+        "uncovered_providers": ranges.uncovered,
+        "pending_lookups": sum(1 for host in remote_hosts.values() if host == PENDING),
+        "remote_hosts": remote_hosts,
+        "ranges_version": ranges.version,
+        "status": status,
+        "summary": summary,
     }
 
 
@@ -67,6 +91,18 @@ def get_bytes_transferred() -> dict:
     }
 
 
+def _provider_endpoint(ranges, provider: str) -> str:
+    endpoints = ranges.providers.get(provider, {}).get("endpoints")
+    return endpoints[0] if endpoints else provider
+
+
+def _is_public(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+
 def _format_bytes(b: int) -> str:
     for unit in ['B', 'KB', 'MB', 'GB']:
         if b < 1024:
@@ -81,6 +117,7 @@ if __name__ == "__main__":
     print(f"Cloud AI Connections: {status['cloud_ai_connections']}")
     print(f"Local AI Connections: {status['local_ai_connections']}")
     print(f"Total Established: {status['total_established']}")
+    print(f"Pending Lookups: {status['pending_lookups']}")
     print(f"Summary: {status['summary']}")
     
     bytes_info = get_bytes_transferred()
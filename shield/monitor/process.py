@@ -0,0 +1,200 @@
+import ipaddress
+import os
+import socket
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+import psutil
+
+import config
+from monitor.cidr_index import get_cloud_ranges
+
+
+class NetworkSnapshot(NamedTuple):
+    taken: float
+    connections: frozenset
+    read_chars: int
+    write_chars: int
+
+
+class ProcessNetworkMonitor:
+    def __init__(self, pid: int = None, tree_refresh: float = None):
+        self.root = psutil.Process(pid or os.getpid())
+        self.tree_refresh = config.PROCESS_TREE_REFRESH if tree_refresh is None else tree_refresh
+        self._lock = threading.Lock()
+        self._tree = [self.root]
+        self._tree_checked = 0.0
+        self._llm_base_url = None
+        self._llm_endpoints = frozenset()
+        self._io_read_cost = _io_read_cost(self.root)
+
+    def connections(self) -> list:
+        established = []
+        for proc in self._processes():
+            try:
+                conns = _net_connections(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            established.extend(
+                conn for conn in conns
+                if conn.status == psutil.CONN_ESTABLISHED and conn.raddr
+            )
+        return established
+
+    def peers(self) -> frozenset:
+        processes = self._processes()
+        if len(processes) == 1 and processes[0].pid == os.getpid() and os.path.isdir(_FD_DIR):
+            return _own_tcp_peers()
+        return frozenset((c.raddr.ip, c.raddr.port) for c in self.connections())
+
+    def snapshot(self) -> NetworkSnapshot:
+        connections = self.peers()
+        read_chars, write_chars = self._io_totals()
+        return NetworkSnapshot(time.perf_counter(), connections, read_chars, write_chars)
+
+    def measure(self, before: NetworkSnapshot) -> dict:
+        started = time.perf_counter()
+        read_chars, write_chars = self._io_totals()
+        after = self.peers()
+        seen = before.connections | after
+
+        external = sorted(c for c in seen if not _is_private(c[0]))
+        ranges = get_cloud_ranges()
+        monitor_reads = self._io_read_cost * len(self._tree)
+
+        return {
+            "scope": "process",
+            "process_connections": len(after),
+            "opened_connections": len(after - before.connections),
+            "local_llm_connections": sum(1 for c in seen if self.is_local_llm(*c)),
+            "external_connections": len(external),
+            "cloud_ai_connections": sum(1 for ip, _ in external if ranges.classify(ip) is not None),
+            "external_endpoints": [f"{ip}:{port}" for ip, port in external],
+            "io_read_bytes": max(read_chars - before.read_chars - monitor_reads, 0),
+            "io_write_bytes": max(write_chars - before.write_chars, 0),
+            "duration_ms": round((started - before.taken) * 1000, 3),
+            "measure_us": round((time.perf_counter() - started) * 1e6),
+        }
+
+    def is_local_llm(self, ip: str, port: int) -> bool:
+        if self._llm_base_url != config.LLM_BASE_URL:
+            self._llm_base_url = config.LLM_BASE_URL
+            self._llm_endpoints = _llm_endpoints(config.LLM_BASE_URL)
+        if (ip, port) in self._llm_endpoints:
+            return True
+        return port in config.LOCAL_LLM_PORTS and _is_loopback(ip)
+
+    def _io_totals(self) -> tuple[int, int]:
+        read_chars = write_chars = 0
+        for proc in self._processes():
+            try:
+                io = proc.io_counters()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            read_chars += getattr(io, "read_chars", io.read_bytes)
+            write_chars += getattr(io, "write_chars", io.write_bytes)
+        return read_chars, write_chars
+
+    def _processes(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._tree_checked >= self.tree_refresh:
+                self._tree_checked = now
+                try:
+                    self._tree = [self.root, *self.root.children(recursive=True)]
+                except psutil.Error:
+                    self._tree = [self.root]
+            return self._tree
+
+
+def _own_tcp_peers() -> frozenset:
+    peers = set()
+    listening = set()
+    for name in os.listdir(_FD_DIR):
+        try:
+            if not os.readlink(f"{_FD_DIR}/{name}").startswith("socket:"):
+                continue
+            sock = socket.socket(fileno=os.dup(int(name)))
+        except (OSError, ValueError):
+            continue
+        try:
+            if sock.type != socket.SOCK_STREAM or sock.family not in (socket.AF_INET, socket.AF_INET6):
+                continue
+            local_port = sock.getsockname()[1]
+            if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ACCEPTCONN):
+                listening.add(local_port)
+                continue
+            peer = sock.getpeername()
+            peers.add((local_port, peer[0], peer[1]))
+        except OSError:
+            continue
+        finally:
+            sock.close()
+
+    return frozenset((ip, port) for local_port, ip, port in peers if local_port not in listening)
+
+
+def _io_read_cost(proc: psutil.Process) -> int:
+    try:
+        first = proc.io_counters()
+        second = proc.io_counters()
+    except (psutil.AccessDenied, AttributeError):
+        return 0
+    return getattr(second, "read_chars", 0) - getattr(first, "read_chars", 0)
+
+
+def _net_connections(proc: psutil.Process) -> list:
+    if hasattr(proc, "net_connections"):
+        return proc.net_connections(kind="tcp")
+    return proc.connections(kind="tcp")
+
+
+def _llm_endpoints(base_url: str) -> frozenset:
+    parsed = urlparse(base_url)
+    if not parsed.hostname:
+        return frozenset()
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    hosts = {"127.0.0.1", "::1"} if parsed.hostname == "localhost" else {parsed.hostname}
+    return frozenset((host, port) for host in hosts)
+
+
+def _is_loopback(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_loopback
+    except ValueError:
+        return False
+
+
+def _is_private(ip: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private or address.is_link_local
+
+
+_FD_DIR = "/proc/self/fd"
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_process_monitor() -> ProcessNetworkMonitor:
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = ProcessNetworkMonitor()
+    return _monitor
+
+
+if __name__ == "__main__":
+    monitor = get_process_monitor()
+    before = monitor.snapshot()
+    listener = socket.create_server(("127.0.0.1", 0))
+    client = socket.create_connection(listener.getsockname())
+    client.sendall(b"x" * 4096)
+    print(monitor.measure(before))
+    client.close()
+    listener.close()
@@ -0,0 +1,129 @@
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import config
+
+
+PENDING = "pending"
+
+_LOCAL_NAMES = {"127.0.0.1": "localhost", "::1": "localhost"}
+
+
+class ReverseResolver:
+    def __init__(
+        self,
+        ttl: float = None,
+        negative_ttl: float = None,
+        workers: int = None,
+        budget: float = None,
+        max_entries: int = None,
+    ):
+        self.ttl = config.DNS_CACHE_TTL if ttl is None else ttl
+        self.negative_ttl = config.DNS_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        self.budget = config.DNS_LOOKUP_BUDGET if budget is None else budget
+        self.max_entries = max_entries or config.DNS_CACHE_SIZE
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or config.DNS_LOOKUP_WORKERS, thread_name_prefix="shield-dns",
+        )
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight = {}
+        self._stats = {"hits": 0, "misses": 0, "negative": 0, "timeouts": 0}
+
+    def resolve_many(self, ips, budget: float = None) -> dict[str, str]:
+        now = time.monotonic()
+        names = {}
+        waiting = []
+
+        with self._lock:
+            for ip in set(ips):
+                if ip in _LOCAL_NAMES:
+                    names[ip] = _LOCAL_NAMES[ip]
+                    continue
+
+                cached = self._cache.get(ip)
+                if cached is not None and cached[1] > now:
+                    self._cache.move_to_end(ip)
+                    self._stats["hits"] += 1
+                    names[ip] = cached[0]
+                    continue
+
+                self._stats["misses"] += 1
+                future = self._inflight.get(ip)
+                if future is None:
+                    future = self._pool.submit(self._lookup, ip)
+                    self._inflight[ip] = future
+                waiting.append((ip, future))
+
+        if waiting:
+            wait([f for _, f in waiting], timeout=self.budget if budget is None else budget)
+
+        for ip, future in waiting:
+            if future.done():
+                names[ip] = future.result()
+            else:
+                names[ip] = PENDING
+                with self._lock:
+                    self._stats["timeouts"] += 1
+
+        return names
+
+    def resolve(self, ip: str, budget: float = None) -> str:
+        return self.resolve_many([ip], budget)[ip]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._cache), "inflight": len(self._inflight)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _prune(self, now: float) -> None:
+        expired = [ip for ip, (_, expires) in self._cache.items() if expires <= now]
+        for ip in expired:
+            del self._cache[ip]
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _lookup(self, ip: str) -> str:
+        try:
+            hostname = socket.gethostbyaddr(ip)[0]
+            expires = time.monotonic() + self.ttl
+        except (OSError, UnicodeError):
+            hostname = ip
+            expires = time.monotonic() + self.negative_ttl
+
+        with self._lock:
+            if hostname == ip:
+                self._stats["negative"] += 1
+            self._cache[ip] = (hostname, expires)
+            self._cache.move_to_end(ip)
+            self._prune(time.monotonic())
+            self._inflight.pop(ip, None)
+        return hostname
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> ReverseResolver:
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = ReverseResolver()
+    return _resolver
+
+
+if __name__ == "__main__":
+    resolver = get_resolver()
+    ips = ["8.8.8.8", "1.1.1.1", "127.0.0.1", "192.0.2.1"]
+    print(resolver.resolve_many(ips))
+    time.sleep(2)
+    print(resolver.resolve_many(ips))
+    print(resolver.stats())
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import psutil
+
+import config
+from monitor.network import get_network_status
+
+
+class NetworkSampler:
+    def __init__(self, interval: float = None, history_size: int = None):
+        self.interval = interval or config.NETWORK_MONITOR_INTERVAL
+        self._samples = deque(maxlen=history_size or config.NETWORK_HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._status: Optional[dict] = None
+
+    def start(self) -> "NetworkSampler":
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, name="shield-net-sampler", daemon=True)
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            if self._status is not None:
+                return self._status
+        return self.sample()
+
+    def history(self) -> list[dict]:
+        with self._lock:
+            return list(self._samples)
+
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def sample(self) -> dict:
+        status = get_network_status()
+        counters = psutil.net_io_counters()
+
+        with self._lock:
+            previous = self._samples[-1] if self._samples else None
+            sample = {
+                "time": time.time(),
+                "total_established": status["total_established"],
+                "cloud_ai_connections": status["cloud_ai_connections"],
+                "local_ai_connections": status["local_ai_connections"],
+                "bytes_sent": counters.bytes_sent,
+                "bytes_recv": counters.bytes_recv,
+                "connections_delta": status["total_established"] - previous["total_established"] if previous else 0,
+                "bytes_sent_delta": max(counters.bytes_sent - previous["bytes_sent"], 0) if previous else 0,
+                "bytes_recv_delta": max(counters.bytes_recv - previous["bytes_recv"], 0) if previous else 0,
+            }
+            self._samples.append(sample)
+            self._status = status
+        return status
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Network sample failed: {e}")
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> NetworkSampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = NetworkSampler().start()
+    return _sampler
+
+
+if __name__ == "__main__":
+    sampler = get_sampler()
+    for _ in range(5):
+        time.sleep(sampler.interval)
+        latest = sampler.latest()
+        print(
+            f"connections={latest['total_established']} ({latest['connections_delta']:+d}) "
+            f"sent=+{latest['bytes_sent_delta']}B recv=+{latest['bytes_recv_delta']}B"
+        )
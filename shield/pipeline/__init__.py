@@ -1 +1 @@
-__all__ = ["rag", "analyzer"]
+__all__ = ["rag", "analyzer", "cache", "vector_store", "lexical", "warmup"]
@@ -1,12 +1,24 @@
+import asyncio
+import copy
 import json
-from openai import OpenAI
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 import config
 from tools.url_analyzer import analyze_urls
-from tools.sender_verifier import verify_sender
+from tools.sender_verifier import extract_sender, verify_sender
 from tools.urgency_classifier import classify_urgency
+from tools.sender_registry import get_registry
+from pipeline.cache import VerdictCache, config_fingerprint
+from pipeline.transport import CircuitOpen, get_transport
+from monitor.process import get_process_monitor
 
 
+LLM_UNAVAILABLE = "LLM analysis unavailable"
+TRUSTED_SENDER_SOURCES = frozenset({"caller", "header"})
+
 SYSTEM_PROMPT = """You are SHIELD, an expert AI fraud analyst specializing in Indian UPI and digital payment scams.
 
 You will receive:
@@ -41,35 +53,336 @@ RULES:
 
 
 class FraudAnalyzer:
-    def __init__(self, rag_engine=None):
-        self.client = OpenAI(
-            base_url=config.LLM_BASE_URL,
-            api_key=config.LLM_API_KEY,
-        )
+    def __init__(self, rag_engine=None, fast_path: bool = None, cache: VerdictCache = None):
+        self.llm = get_transport()
         self.model = config.LLM_MODEL
         self.rag_engine = rag_engine
+        self._stage_pool = ThreadPoolExecutor(
+            max_workers=config.STAGE_WORKERS, thread_name_prefix="shield-stage",
+        )
+        self.fast_path = config.FAST_PATH_ENABLED if fast_path is None else fast_path
+
+        if cache is None and config.VERDICT_CACHE_ENABLED:
+            cache = VerdictCache(
+                version=config_fingerprint(self.fast_path, rag_engine is not None),
+                db_path=config.VERDICT_CACHE_PATH,
+            )
+        self.cache = cache
+        self.network_monitor = get_process_monitor() if config.PROCESS_MONITOR_ENABLED else None
+
+    @property
+    def rag_ready(self) -> bool:
+        return self.rag_engine is not None and getattr(self.rag_engine, "ready", True)
 
     def analyze(self, message: str, sender_id: str = None) -> dict:
+        before = self._network_snapshot()
+        return self._attach_network(self._analyze(message, sender_id), before)
+
+    def analyze_stream(self, message: str, sender_id: str = None) -> Iterator[dict]:
+        before = self._network_snapshot()
+        for event in self._analyze_stream(message, sender_id):
+            if event["type"] == "done":
+                self._attach_network(event["result"], before)
+            yield event
+
+    async def aanalyze(self, message: str, sender_id: str = None) -> dict:
+        before = self._network_snapshot()
+        return self._attach_network(await self._aanalyze(message, sender_id), before)
+
+    def analyze_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        before = self._network_snapshot()
+        return self._attach_network_batch(self._analyze_batch(messages, sender_ids), before)
+
+    async def aanalyze_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        before = self._network_snapshot()
+        return self._attach_network_batch(await self._aanalyze_batch(messages, sender_ids), before)
+
+    def _analyze(self, message: str, sender_id: str = None) -> dict:
+        started = time.perf_counter()
+        cache_key = self._cache_key(message, sender_id)
+        cached = self._cache_lookup(cache_key, message, started)
+        if cached is not None:
+            return cached
+
+        tool_results, rag_future, timings = self._start_stages(message, sender_id)
+
+        fast_verdict, degraded = self._shortcut_verdict(tool_results)
+        if fast_verdict is not None:
+            _cancel(rag_future)
+            result = self._build_result(
+                message, tool_results, [], fast_verdict, fast_path=not degraded, degraded=degraded,
+                timings=_finish_timings(timings, started),
+            )
+            return self._cache_store(cache_key, result)
+
+        rag_results = rag_future.result() if rag_future is not None else []
+
+        with _timed(timings, "prompt_ms"):
+            llm_prompt = self._build_prompt(message, tool_results, rag_results)
+
+        with _timed(timings, "llm_ms"):
+            llm_analysis, degraded = self._complete(llm_prompt, tool_results)
+
+        result = self._build_result(
+            message, tool_results, rag_results, llm_analysis, degraded=degraded,
+            timings=_finish_timings(timings, started),
+        )
+        return self._cache_store(cache_key, result)
+
+    def _analyze_stream(self, message: str, sender_id: str = None) -> Iterator[dict]:
+        started = time.perf_counter()
+        cache_key = self._cache_key(message, sender_id)
+        cached = self._cache_lookup(cache_key, message, started)
+        if cached is not None:
+            yield self._tools_event(cached["tool_results"])
+            yield {"type": "rag", "sources": cached["rag_sources"]}
+            yield {"type": "token", "text": cached["llm_analysis"]}
+            yield {"type": "done", "result": cached}
+            return
+
+        tool_results, rag_future, timings = self._start_stages(message, sender_id)
+        yield self._tools_event(tool_results)
+
+        fast_verdict, degraded = self._shortcut_verdict(tool_results)
+        if fast_verdict is not None:
+            _cancel(rag_future)
+            yield {"type": "rag", "sources": []}
+            yield {"type": "token", "text": fast_verdict}
+            result = self._build_result(
+                message, tool_results, [], fast_verdict, fast_path=not degraded, degraded=degraded,
+                timings=_finish_timings(timings, started),
+            )
+            yield {"type": "done", "result": self._cache_store(cache_key, result)}
+            return
+
+        rag_results = rag_future.result() if rag_future is not None else []
+        yield {"type": "rag", "sources": [r["source"] for r in rag_results]}
+
+        with _timed(timings, "prompt_ms"):
+            llm_prompt = self._build_prompt(message, tool_results, rag_results)
+
+        tokens = []
+        degraded = False
+        with _timed(timings, "llm_ms"):
+            try:
+                for text in self.llm.stream(self._llm_request(llm_prompt)):
+                    tokens.append(text)
+                    yield {"type": "token", "text": text}
+            except Exception as e:
+                if tokens:
+                    text = f"\n\n{LLM_UNAVAILABLE}: {e}"
+                else:
+                    text = self._degraded_verdict(tool_results, e)
+                    degraded = True
+                tokens.append(text)
+                yield {"type": "token", "text": text}
+
+        result = self._build_result(
+            message, tool_results, rag_results, "".join(tokens), degraded=degraded,
+            timings=_finish_timings(timings, started),
+        )
+        yield {"type": "done", "result": self._cache_store(cache_key, result)}
+
+    async def _aanalyze(self, message: str, sender_id: str = None) -> dict:
+        started = time.perf_counter()
+        cache_key = self._cache_key(message, sender_id)
+        cached = self._cache_lookup(cache_key, message, started)
+        if cached is not None:
+            return cached
+
+        tool_results, rag_future, timings = self._start_stages(message, sender_id)
+
+        fast_verdict, degraded = self._shortcut_verdict(tool_results)
+        if fast_verdict is not None:
+            _cancel(rag_future)
+            result = self._build_result(
+                message, tool_results, [], fast_verdict, fast_path=not degraded, degraded=degraded,
+                timings=_finish_timings(timings, started),
+            )
+            return self._cache_store(cache_key, result)
+
+        rag_results = await asyncio.wrap_future(rag_future) if rag_future is not None else []
+
+        with _timed(timings, "prompt_ms"):
+            llm_prompt = self._build_prompt(message, tool_results, rag_results)
+
+        with _timed(timings, "llm_ms"):
+            llm_analysis, degraded = await self._acomplete(llm_prompt, tool_results)
+
+        result = self._build_result(
+            message, tool_results, rag_results, llm_analysis, degraded=degraded,
+            timings=_finish_timings(timings, started),
+        )
+        return self._cache_store(cache_key, result)
+
+    def _analyze_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        prepared = self._prepare_batch(messages, sender_ids)
+
+        def finish(item: dict) -> Optional[dict]:
+            if "prompt" not in item:
+                return item.get("result")
+            llm_analysis, degraded = self._complete(item["prompt"], item["tool_results"])
+            return self._build_result(
+                item["message"], item["tool_results"], item["rag_results"], llm_analysis, degraded=degraded,
+            )
+
+        with ThreadPoolExecutor(max_workers=config.LLM_MAX_CONCURRENCY) as pool:
+            results = list(pool.map(finish, prepared))
+
+        return self._collect_batch(prepared, results)
+
+    async def _aanalyze_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        prepared = await asyncio.to_thread(self._prepare_batch, messages, sender_ids)
+        semaphore = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+
+        async def finish(item: dict) -> Optional[dict]:
+            if "prompt" not in item:
+                return item.get("result")
+            async with semaphore:
+                llm_analysis, degraded = await self._acomplete(item["prompt"], item["tool_results"])
+            return self._build_result(
+                item["message"], item["tool_results"], item["rag_results"], llm_analysis, degraded=degraded,
+            )
+
+        results = list(await asyncio.gather(*(finish(item) for item in prepared)))
+
+        return self._collect_batch(prepared, results)
+
+    def analyze_tools(self, message: str, sender_id: str = None) -> dict:
         tool_results = self._run_tools(message, sender_id)
+        return {
+            "message": message,
+            "tool_results": tool_results,
+            "combined_tool_risk": self._calculate_combined_risk(tool_results),
+            "category": _infer_category(tool_results),
+        }
 
-        rag_results = self._get_rag_context(message)
+    def _prepare_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        if sender_ids is None:
+            sender_ids = [None] * len(messages)
+        if len(sender_ids) != len(messages):
+            raise ValueError("sender_ids must be the same length as messages")
+
+        prepared = []
+        first_seen = {}
+        for i, (message, sender_id) in enumerate(zip(messages, sender_ids)):
+            cache_key = self._cache_key(message, sender_id)
+            item = {"message": message, "cache_key": cache_key}
+            prepared.append(item)
+
+            if cache_key is not None and cache_key in first_seen:
+                item["duplicate_of"] = first_seen[cache_key]
+                continue
+
+            cached = self._cache_lookup(cache_key, message)
+            if cached is not None:
+                item["result"] = cached
+                continue
+            if cache_key is not None:
+                first_seen[cache_key] = i
+
+            try:
+                tool_results = self._run_tools(message, sender_id)
+            except Exception as e:
+                item["result"] = {"message": message, "error": f"Tool analysis failed: {str(e)}"}
+                continue
+
+            item["tool_results"] = tool_results
+            fast_verdict, degraded = self._shortcut_verdict(tool_results)
+            if fast_verdict is not None:
+                item["result"] = self._build_result(
+                    message, tool_results, [], fast_verdict, fast_path=not degraded, degraded=degraded,
+                )
+
+        pending = [item for item in prepared if "tool_results" in item and "result" not in item]
+        rag_batch = self._get_rag_context_batch([item["message"] for item in pending])
+
+        for item, rag_results in zip(pending, rag_batch):
+            item["rag_results"] = rag_results
+            item["prompt"] = self._build_prompt(item["message"], item["tool_results"], rag_results)
+
+        return prepared
+
+    def _collect_batch(self, prepared: list[dict], results: list[Optional[dict]]) -> list[dict]:
+        for item, result in zip(prepared, results):
+            if result is not None and "tool_results" in item:
+                self._cache_store(item["cache_key"], result)
+
+        for i, item in enumerate(prepared):
+            if "duplicate_of" in item:
+                source = results[item["duplicate_of"]]
+                if "error" in source:
+                    results[i] = {"message": item["message"], "error": source["error"]}
+                else:
+                    results[i] = {**copy.deepcopy(source), "message": item["message"]}
+
+        return results
+
+    def _cache_key(self, message: str, sender_id: str = None) -> Optional[str]:
+        if self.cache is None:
+            return None
+        context = get_registry().version
+        if self.rag_engine is not None and not self.rag_ready:
+            if not getattr(self.rag_engine, "failed", False):
+                return None
+            context = f"{context}|no-rag"
+        source = "caller"
+        if not sender_id:
+            sender_id, source = extract_sender(message)
+        return self.cache.key(message, sender_id and f"{source}:{sender_id}", context=context)
+
+    def _cache_lookup(self, cache_key: Optional[str], message: str, started: float = None) -> Optional[dict]:
+        if cache_key is None:
+            return None
+        result = self.cache.get(cache_key)
+        if result is None:
+            return None
+        result["message"] = message
+        result["cache_hit"] = True
+        result["cloud_connections"] = None
+        result["network"] = None
+        result["timings"] = _finish_timings({}, started) if started is not None else {}
+        return result
+
+    def _cache_store(self, cache_key: Optional[str], result: dict) -> dict:
+        if cache_key is not None and LLM_UNAVAILABLE not in result["llm_analysis"]:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _llm_request(self, llm_prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": llm_prompt},
+            ],
+            "temperature": config.LLM_TEMPERATURE,
+            "max_tokens": config.LLM_MAX_TOKENS,
+        }
 
-        llm_prompt = self._build_prompt(message, tool_results, rag_results)
+    def _complete(self, llm_prompt: str, tool_results: dict) -> tuple[str, bool]:
+        try:
+            return self.llm.complete(self._llm_request(llm_prompt)), False
+        except Exception as e:
+            return self._degraded_verdict(tool_results, e), True
 
+    async def _acomplete(self, llm_prompt: str, tool_results: dict) -> tuple[str, bool]:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": llm_prompt},
-                ],
-                temperature=config.LLM_TEMPERATURE,
-                max_tokens=config.LLM_MAX_TOKENS,
-            )
-            llm_analysis = response.choices[0].message.content
+            return await self.llm.acomplete(self._llm_request(llm_prompt)), False
         except Exception as e:
-            llm_analysis = f"LLM analysis unavailable: {str(e)}"
+            return self._degraded_verdict(tool_results, e), True
+
+    def _tools_event(self, tool_results: dict) -> dict:
+        return {
+            "type": "tools",
+            "tool_results": tool_results,
+            "combined_tool_risk": self._calculate_combined_risk(tool_results),
+        }
 
+    def _build_result(
+        self, message: str, tool_results: dict, rag_results: list, llm_analysis: str,
+        fast_path: bool = False, degraded: bool = False, timings: dict = None,
+    ) -> dict:
         combined_risk = self._calculate_combined_risk(tool_results)
 
         return {
@@ -78,10 +391,140 @@ class FraudAnalyzer:
             "rag_sources": [r["source"] for r in rag_results],
             "llm_analysis": llm_analysis,
             "combined_tool_risk": combined_risk,
-            "model_used": self.model,
-            "cloud_connections": 0,
+            "model_used": None if fast_path or degraded else self.model,
+            "fast_path": fast_path,
+            "degraded": degraded,
+            "cache_hit": False,
+            "rag_ready": self.rag_ready,
+            "timings": timings or {},
+            "cloud_connections": None,
+            "network": None,
         }
 
+    def _network_snapshot(self):
+        if self.network_monitor is None:
+            return None
+        return self.network_monitor.snapshot()
+
+    def _attach_network(self, result: dict, before) -> dict:
+        if before is not None and "error" not in result:
+            network = self.network_monitor.measure(before)
+            result["network"] = network
+            result["cloud_connections"] = network["cloud_ai_connections"]
+        return result
+
+    def _attach_network_batch(self, results: list[dict], before) -> list[dict]:
+        if before is None:
+            return results
+        network = self.network_monitor.measure(before)
+        for result in results:
+            if "error" not in result:
+                result["network"] = {**network, "batch_size": len(results)}
+                result["cloud_connections"] = network["cloud_ai_connections"]
+        return results
+
+    def _fast_path_verdict(self, tools: dict) -> Optional[str]:
+        if not self.fast_path:
+            return None
+
+        url = tools["url_analysis"]
+        sender = tools["sender_verification"]
+        urgency = tools["urgency_analysis"]
+
+        if urgency["pin_otp_requested"]:
+            red_flags = ["Asks you to share your PIN, OTP, CVV or password"]
+            red_flags += [ind for a in url["analyses"] for ind in a["indicators"]]
+            red_flags += sender["indicators"]
+            return _format_verdict(
+                risk=100,
+                category=_infer_category(tools),
+                red_flags=red_flags,
+                explanation=urgency["summary"],
+                action=(
+                    "Do not reply, click any link or share any code. Block the sender "
+                    "and report it at cybercrime.gov.in or by calling 1930."
+                ),
+            )
+
+        if (
+            sender["is_verified"]
+            and sender.get("sender_source") in TRUSTED_SENDER_SOURCES
+            and url["urls_found"] == 0
+            and not urgency["urgency_detected"]
+        ):
+            return _format_verdict(
+                risk=self._calculate_combined_risk(tools),
+                category="Legitimate",
+                red_flags=[],
+                explanation=(
+                    f"{sender['summary']} The message contains no links and no "
+                    f"pressure tactics, which matches a normal bank notification."
+                ),
+                action=(
+                    "No action needed. If anything looks unfamiliar, check it in your "
+                    "bank's official app rather than replying to the message."
+                ),
+            )
+
+        return None
+
+    def _shortcut_verdict(self, tools: dict) -> tuple[Optional[str], bool]:
+        fast_verdict = self._fast_path_verdict(tools)
+        if fast_verdict is not None:
+            return fast_verdict, False
+        if not self.llm.available():
+            return self._degraded_verdict(tools, CircuitOpen(self.llm.status()["state"])), True
+        return None, False
+
+    def _degraded_verdict(self, tools: dict, error: Exception) -> str:
+        url = tools["url_analysis"]
+        sender = tools["sender_verification"]
+        urgency = tools["urgency_analysis"]
+        risk = self._calculate_combined_risk(tools)
+
+        red_flags = [ind for a in url["analyses"] for ind in a["indicators"]]
+        red_flags += sender["indicators"]
+        if urgency["urgency_detected"]:
+            red_flags.append(urgency["summary"])
+
+        reason = "the local model is not responding" if isinstance(error, CircuitOpen) else str(error)
+        return _format_verdict(
+            risk=risk,
+            category=_infer_category(tools),
+            red_flags=red_flags,
+            explanation=(
+                f"{LLM_UNAVAILABLE} ({reason}). This verdict is based only on the "
+                f"URL, sender and urgency checks."
+            ),
+            action=(
+                "Do not click any link or share any code. Verify the message through your "
+                "bank's official app or helpline before acting on it."
+            ) if risk >= 50 else (
+                "No strong fraud signals were found, but verify anything unexpected in your "
+                "bank's official app rather than replying to the message."
+            ),
+            confidence="Low",
+        )
+
+    def _start_stages(self, message: str, sender_id: str = None) -> tuple[dict, Optional[Future], dict]:
+        timings = {}
+        rag_future = None
+        if self.rag_ready:
+            rag_future = self._stage_pool.submit(_timed_call, timings, "rag_ms", self._get_rag_context, message)
+
+        try:
+            tool_results = {
+                "url_analysis": _timed_call(timings, "url_analysis_ms", analyze_urls, message),
+                "sender_verification": _timed_call(
+                    timings, "sender_verification_ms", verify_sender, message, sender_id,
+                ),
+                "urgency_analysis": _timed_call(timings, "urgency_analysis_ms", classify_urgency, message),
+            }
+        except Exception:
+            _cancel(rag_future)
+            raise
+        return tool_results, rag_future, timings
+
     def _run_tools(self, message: str, sender_id: str = None) -> dict:
         return {
             "url_analysis": analyze_urls(message),
@@ -90,7 +533,7 @@ class FraudAnalyzer:
         }
 
     def _get_rag_context(self, message: str) -> list[dict]:
-        if self.rag_engine is None:
+        if not self.rag_ready:
             return []
         try:
             return self.rag_engine.retrieve(message, top_k=config.RAG_TOP_K)
@@ -98,6 +541,15 @@ class FraudAnalyzer:
             print(f"RAG retrieval failed: {e}")
             return []
 
+    def _get_rag_context_batch(self, messages: list[str]) -> list[list[dict]]:
+        if not self.rag_ready or not messages:
+            return [[] for _ in messages]
+        try:
+            return self.rag_engine.retrieve_batch(messages, top_k=config.RAG_TOP_K)
+        except Exception as e:
+            print(f"RAG batch retrieval failed: {e}")
+            return [[] for _ in messages]
+
     def _build_prompt(self, message: str, tools: dict, rag: list) -> str:
         url = tools["url_analysis"]
         sender = tools["sender_verification"]
@@ -167,6 +619,60 @@ Based on ALL the above information, provide your complete fraud analysis."""
         return combined
 
 
+@contextmanager
+def _timed(timings: dict, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def _timed_call(timings: dict, name: str, fn, *args):
+    with _timed(timings, name):
+        return fn(*args)
+
+
+def _cancel(future: Optional[Future]) -> None:
+    if future is not None:
+        future.cancel()
+
+
+def _finish_timings(timings: dict, started: float) -> dict:
+    timings = dict(timings)
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return timings
+
+
+def _infer_category(tools: dict) -> str:
+    categories = tools["urgency_analysis"]["tactic_categories"]
+    if "legal_threat" in categories:
+        return "Digital Arrest Scam"
+    if tools["url_analysis"]["urls_found"] > 0:
+        return "Phishing SMS"
+    if "greed_trigger" in categories:
+        return "Lottery Scam"
+    return "Unclear"
+
+
+def _format_verdict(
+    risk: int, category: str, red_flags: list[str], explanation: str, action: str, confidence: str = "High",
+) -> str:
+    flags = "\n".join(f"- {flag}" for flag in red_flags) if red_flags else "- None"
+    return f"""RISK SCORE: {risk}%
+FRAUD CATEGORY: {category}
+CONFIDENCE: {confidence}
+
+RED FLAGS:
+{flags}
+
+EXPLANATION:
+{explanation}
+
+RECOMMENDED ACTION:
+{action}"""
+
+
 if __name__ == "__main__":
     from pipeline.rag import RAGEngine
 
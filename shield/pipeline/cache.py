@@ -0,0 +1,154 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import config
+
+
+_AMOUNT_RE = re.compile(r'(?:rs\.?|inr|₹)\s*\d[\d,]*(?:\.\d+)?')
+_ACCOUNT_MASK_RE = re.compile(r'[x*]{2,}\d+')
+_DIGITS_RE = re.compile(r'\d+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_VERBATIM_RE = re.compile(
+    r'(?:https?://|www\.|(?:bit\.ly|tinyurl\.com|goo\.gl|t\.co)/)\S+'
+    r'|^(?:ad|td|ta|tm|vm|dm|si)-[a-z0-9]{4,8}'
+    r'|\[[a-z0-9]{4,8}\]'
+    r'|^from:?\s*[a-z0-9]{4,8}'
+)
+
+
+def normalize_message(message: str) -> str:
+    text = message.lower()
+    parts = []
+    end = 0
+    for match in _VERBATIM_RE.finditer(text):
+        parts.append(_fold_numbers(text[end:match.start()]))
+        parts.append(match.group())
+        end = match.end()
+    parts.append(_fold_numbers(text[end:]))
+    return _WHITESPACE_RE.sub(" ", "".join(parts)).strip()
+
+
+def _fold_numbers(text: str) -> str:
+    text = _AMOUNT_RE.sub("<amt>", text)
+    text = _ACCOUNT_MASK_RE.sub("<acct>", text)
+    return _DIGITS_RE.sub("<num>", text)
+
+
+def config_fingerprint(*extra) -> str:
+    parts = [
+        config.VERDICT_CACHE_VERSION,
+        config.LLM_PROVIDER,
+        config.LLM_MODEL,
+        config.LLM_TEMPERATURE,
+        config.LLM_MAX_TOKENS,
+        config.EMBEDDING_MODEL,
+        config.RAG_TOP_K,
+        *extra,
+    ]
+    return "|".join(str(p) for p in parts)
+
+
+class VerdictCache:
+    def __init__(
+        self,
+        version: str = "",
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        db_path: str = None,
+    ):
+        self.version = version
+        self.max_entries = max_entries or config.VERDICT_CACHE_SIZE
+        self.ttl_seconds = config.VERDICT_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+
+        self._db = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            if self.ttl_seconds:
+                self._db.execute(
+                    "DELETE FROM verdicts WHERE created < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+            self._db.commit()
+
+    def key(self, message: str, sender_id: Optional[str] = None, context: str = "") -> str:
+        sender = (sender_id or "").upper().strip()
+        raw = "\0".join([self.version, context, sender, normalize_message(message)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, payload = entry
+                if self._is_fresh(created, now):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return json.loads(payload)
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, payload FROM verdicts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._is_fresh(row[0], now):
+                    self._store(key, row[0], row[1])
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return json.loads(row[1])
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        created = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._store(key, created, payload)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, created, payload) VALUES (?, ?, ?)",
+                    (key, created, payload),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM verdicts")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, created: float, payload: str) -> None:
+        self._entries[key] = (created, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _is_fresh(self, created: float, now: float) -> bool:
+        return not self.ttl_seconds or now - created < self.ttl_seconds
@@ -0,0 +1,74 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks: list[dict] = []
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths: list[int] = []
+        self._idf: dict[str, float] = {}
+        self._avg_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def from_chunks(cls, chunks: list[dict], **kwargs) -> "BM25Index":
+        index = cls(**kwargs)
+        for chunk in chunks:
+            index.add(chunk)
+        index.build()
+        return index
+
+    def add(self, chunk: dict) -> None:
+        doc = len(self.chunks)
+        self.chunks.append(chunk)
+        terms = Counter(tokenize(chunk["text"]))
+        for term, tf in terms.items():
+            self._postings[term].append((doc, tf))
+        self._lengths.append(sum(terms.values()))
+
+    def build(self) -> None:
+        n = len(self.chunks)
+        self._avg_len = sum(self._lengths) / n if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        scores = defaultdict(float)
+        k1, b, avg_len = self.k1, self.b, self._avg_len or 1.0
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self._postings[term]:
+                norm = k1 * (1 - b + b * self._lengths[doc] / avg_len)
+                scores[doc] += idf * tf * (k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: list[list[dict]], top_k: int, k: int = 60) -> list[dict]:
+    fused = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking):
+            key = (result["source"], result["text"])
+            if key not in fused:
+                fused[key] = {**result, "score": 0.0}
+            fused[key]["score"] += 1.0 / (k + rank + 1)
+
+    return sorted(fused.values(), key=lambda r: -r["score"])[:top_k]
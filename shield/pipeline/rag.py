@@ -1,5 +1,9 @@
-import os
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import Optional
 
 from llama_index.core import (
     SimpleDirectoryReader,
@@ -8,61 +12,317 @@ from llama_index.core import (
     load_index_from_storage,
     Settings,
 )
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.core.schema import MetadataMode, QueryBundle
 
 import config
+from pipeline.cache import normalize_message
+from pipeline.lexical import BM25Index, reciprocal_rank_fusion
+from pipeline.vector_store import META_FILE, MatrixVectorStore
+
+
+MANIFEST_FILE = "kb_manifest.json"
 
 
 class RAGEngine:
-    def __init__(self):
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name=config.EMBEDDING_MODEL
-        )
+    def __init__(self, backend: str = None, mode: str = None):
         Settings.llm = None
+        self.backend = backend or config.RAG_BACKEND
+        self.mode = mode or config.RAG_RETRIEVAL_MODE
+        self.embed_model = None
+        self.query_instruction = ""
         self.index = None
+        self.matrix_store = None
+        self.lexical_index = None
         self.query_engine = None
+        self._retrievers = {}
+        self._embedding_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def build_index(self, force_rebuild=False):
-        storage_path = Path(config.VECTOR_STORE_DIR)
+        if self.mode == "lexical":
+            self.lexical_index = BM25Index.from_chunks(
+                _chunk_knowledge_base(Path(config.KNOWLEDGE_BASE_DIR))
+            )
+            print(f"Built lexical index over {len(self.lexical_index)} chunks")
+            return
 
-        if storage_path.exists() and not force_rebuild:
-            try:
-                storage_context = StorageContext.from_defaults(
-                    persist_dir=str(storage_path)
-                )
-                self.index = load_index_from_storage(storage_context)
-                print(f"Loaded existing index from {storage_path}")
-                return
-            except Exception:
-                pass
+        self._load_embed_model()
+        if self.backend == "matrix":
+            self._build_matrix_store(force_rebuild)
+        else:
+            self._build_vector_index(force_rebuild)
+
+        if self.mode == "hybrid":
+            self.lexical_index = BM25Index.from_chunks(self._dense_chunks())
+
+    def _load_embed_model(self):
+        if self.embed_model is None:
+            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+            from llama_index.embeddings.huggingface.utils import get_query_instruct_for_model_name
 
+            self.embed_model = HuggingFaceEmbedding(
+                model_name=config.EMBEDDING_MODEL
+            )
+            self.query_instruction = (
+                self.embed_model.query_instruction or get_query_instruct_for_model_name(config.EMBEDDING_MODEL)
+            )
+            Settings.embed_model = self.embed_model
+
+    def _build_vector_index(self, force_rebuild=False):
+        self._retrievers = {}
+        storage_path = Path(config.VECTOR_STORE_DIR)
         kb_path = Path(config.KNOWLEDGE_BASE_DIR)
         if not kb_path.exists():
             raise FileNotFoundError(f"Knowledge base not found at {kb_path}")
 
-        documents = SimpleDirectoryReader(
-            str(kb_path),
-            recursive=True,
-            required_exts=[".md"],
-        ).load_data()
+        current = _hash_knowledge_base(kb_path)
+        manifest_path = storage_path / MANIFEST_FILE
+
+        if storage_path.exists() and not force_rebuild:
+            if not manifest_path.exists():
+                print(f"No manifest in {storage_path}, rebuilding index")
+            else:
+                try:
+                    storage_context = StorageContext.from_defaults(
+                        persist_dir=str(storage_path)
+                    )
+                    self.index = load_index_from_storage(storage_context)
+                    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                    print(f"Loaded existing index from {storage_path}")
+                    self._sync_index(storage_path, kb_path, manifest, current)
+                    return
+                except Exception as e:
+                    print(f"Could not load index from {storage_path} ({e}), rebuilding")
+
+        documents = []
+        manifest = {}
+        for rel_path, digest in current.items():
+            docs = _load_file(kb_path, rel_path)
+            documents.extend(docs)
+            manifest[rel_path] = {"hash": digest, "doc_ids": [d.doc_id for d in docs]}
 
         print(f"Loaded {len(documents)} documents from knowledge base")
 
         self.index = VectorStoreIndex.from_documents(documents)
 
+        self._persist(storage_path, manifest)
+
+    def _sync_index(self, storage_path: Path, kb_path: Path, manifest: dict, current: dict) -> None:
+        removed = [p for p in manifest if p not in current]
+        changed = [p for p in current if p in manifest and manifest[p]["hash"] != current[p]]
+        added = [p for p in current if p not in manifest]
+
+        if not (removed or changed or added):
+            return
+
+        for rel_path in removed + changed:
+            for doc_id in manifest.pop(rel_path)["doc_ids"]:
+                self.index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+        for rel_path in changed + added:
+            docs = _load_file(kb_path, rel_path)
+            for doc in docs:
+                self.index.insert(doc)
+            manifest[rel_path] = {"hash": current[rel_path], "doc_ids": [d.doc_id for d in docs]}
+
+        print(
+            f"Index updated: {len(added)} added, {len(changed)} changed, "
+            f"{len(removed)} removed"
+        )
+        self._persist(storage_path, manifest)
+
+    def _persist(self, storage_path: Path, manifest: dict) -> None:
         storage_path.mkdir(parents=True, exist_ok=True)
         self.index.storage_context.persist(persist_dir=str(storage_path))
+        (storage_path / MANIFEST_FILE).write_text(
+            json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8",
+        )
         print(f"Index saved to {storage_path}")
 
     def retrieve(self, query: str, top_k: int = None) -> list[dict]:
-        if self.index is None:
+        if not self._is_built():
             self.build_index()
 
         k = top_k or config.RAG_TOP_K
 
-        retriever = self.index.as_retriever(similarity_top_k=k)
-        nodes = retriever.retrieve(query)
+        if self.mode == "lexical":
+            return self._search_lexical(query, k)
+
+        key = normalize_message(query)
+        embedding = self._cached_embedding(key)
+        if embedding is None:
+            embedding = self.embed_model.get_query_embedding(query)
+            self._store_embedding(key, embedding)
+
+        dense = self._search_dense([query], [embedding], self._depth(k))[0]
+
+        return self._fuse(query, dense, k)
+
+    def retrieve_batch(self, queries: list[str], top_k: int = None) -> list[list[dict]]:
+        if not self._is_built():
+            self.build_index()
+
+        if not queries:
+            return []
+
+        k = top_k or config.RAG_TOP_K
+
+        if self.mode == "lexical":
+            return [self._search_lexical(q, k) for q in queries]
+
+        keys = [normalize_message(q) for q in queries]
+        embeddings = [self._cached_embedding(key) for key in keys]
+
+        missing = {}
+        for i, (key, emb) in enumerate(zip(keys, embeddings)):
+            if emb is None:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            fresh = self.embed_model.get_text_embedding_batch(
+                [f"{self.query_instruction}{queries[positions[0]]}" for positions in missing.values()]
+            )
+            for (key, positions), emb in zip(missing.items(), fresh):
+                self._store_embedding(key, emb)
+                for i in positions:
+                    embeddings[i] = emb
 
+        dense = self._search_dense(queries, embeddings, self._depth(k))
+
+        return [self._fuse(q, d, k) for q, d in zip(queries, dense)]
+
+    def cache_stats(self) -> dict:
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "entries": len(self._embedding_cache),
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+            }
+
+    def _build_matrix_store(self, force_rebuild=False):
+        store_path = Path(config.MATRIX_STORE_DIR)
+        kb_path = Path(config.KNOWLEDGE_BASE_DIR)
+        if not kb_path.exists():
+            raise FileNotFoundError(f"Knowledge base not found at {kb_path}")
+
+        current = _hash_knowledge_base(kb_path)
+
+        previous = None
+        if (store_path / META_FILE).exists() and not force_rebuild:
+            try:
+                previous = MatrixVectorStore.load(str(store_path))
+            except Exception as e:
+                print(f"Could not load matrix store from {store_path} ({e}), rebuilding")
+
+        if previous is not None and previous.dtype == config.MATRIX_STORE_DTYPE and previous.hashes == current:
+            self.matrix_store = previous
+            print(f"Loaded matrix store from {store_path} ({len(previous)} chunks)")
+            return
+
+        reusable = {}
+        if previous is not None:
+            reusable = {f["path"]: f for f in previous.files if current.get(f["path"]) == f["hash"]}
+
+        parts = []
+        embedded = 0
+        for rel_path, digest in current.items():
+            info = {"path": rel_path, "source": Path(rel_path).name, "hash": digest}
+            old = reusable.get(rel_path)
+            if old is not None:
+                texts = [previous.text(i) for i in range(old["start"], old["end"])]
+                embeddings = previous.embeddings(old["start"], old["end"])
+            else:
+                nodes = Settings.node_parser.get_nodes_from_documents(_load_file(kb_path, rel_path))
+                texts = [node.get_content() for node in nodes]
+                embeddings = self.embed_model.get_text_embedding_batch(
+                    [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+                )
+                embedded += 1
+            parts.append((info, texts, embeddings))
+
+        store = MatrixVectorStore.build(parts, dtype=config.MATRIX_STORE_DTYPE)
+        store.save(str(store_path))
+        self.matrix_store = MatrixVectorStore.load(str(store_path))
+        print(f"Matrix store saved to {store_path} ({embedded} of {len(current)} files embedded)")
+
+    def _is_built(self) -> bool:
+        if self.mode == "lexical":
+            return self.lexical_index is not None
+        return self.index is not None or self.matrix_store is not None
+
+    def _depth(self, k: int) -> int:
+        return k * config.RAG_HYBRID_DEPTH if self.mode == "hybrid" else k
+
+    def _search_dense(self, queries: list[str], embeddings: list, k: int) -> list[list[dict]]:
+        if self.matrix_store is not None:
+            return self._search_matrix(embeddings, k)
+
+        retriever = self._retriever(k)
+        return [
+            self._to_results(retriever.retrieve(QueryBundle(query_str=q, embedding=emb)))
+            for q, emb in zip(queries, embeddings)
+        ]
+
+    def _search_lexical(self, query: str, k: int) -> list[dict]:
+        chunks = self.lexical_index.chunks
+        return [
+            {"text": chunks[doc]["text"], "score": score, "source": chunks[doc]["source"]}
+            for doc, score in self.lexical_index.search(query, k)
+        ]
+
+    def _fuse(self, query: str, dense: list[dict], k: int) -> list[dict]:
+        if self.mode != "hybrid":
+            return dense[:k]
+        return reciprocal_rank_fusion([dense, self._search_lexical(query, self._depth(k))], k)
+
+    def _dense_chunks(self) -> list[dict]:
+        if self.matrix_store is not None:
+            store = self.matrix_store
+            return [{"text": store.text(i), "source": store.source(i)} for i in range(len(store))]
+        return [
+            {"text": node.get_content(), "source": node.metadata.get("file_name", "unknown")}
+            for node in self.index.docstore.docs.values()
+        ]
+
+    def _search_matrix(self, embeddings: list, k: int) -> list[list[dict]]:
+        store = self.matrix_store
+        return [
+            [
+                {"text": store.text(row), "score": score, "source": store.source(row)}
+                for row, score in hits
+            ]
+            for hits in store.search(embeddings, k)
+        ]
+
+    def _retriever(self, k: int):
+        retriever = self._retrievers.get(k)
+        if retriever is None:
+            retriever = self.index.as_retriever(similarity_top_k=k)
+            self._retrievers[k] = retriever
+        return retriever
+
+    def _cached_embedding(self, key: str) -> Optional[list[float]]:
+        with self._cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is None:
+                self._cache_misses += 1
+                return None
+            self._embedding_cache.move_to_end(key)
+            self._cache_hits += 1
+            return embedding
+
+    def _store_embedding(self, key: str, embedding: list[float]) -> None:
+        with self._cache_lock:
+            self._embedding_cache[key] = embedding
+            self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > config.RAG_QUERY_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+
+    def _to_results(self, nodes) -> list[dict]:
         results = []
         for node in nodes:
             results.append({
@@ -74,6 +334,34 @@ class RAGEngine:
         return results
 
 
+def _hash_knowledge_base(kb_path: Path) -> dict:
+    hashes = {}
+    for path in sorted(kb_path.rglob("*.md")):
+        rel_path = path.relative_to(kb_path).as_posix()
+        hashes[rel_path] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return hashes
+
+
+def _chunk_knowledge_base(kb_path: Path) -> list[dict]:
+    if not kb_path.exists():
+        raise FileNotFoundError(f"Knowledge base not found at {kb_path}")
+
+    chunks = []
+    for rel_path in _hash_knowledge_base(kb_path):
+        nodes = Settings.node_parser.get_nodes_from_documents(_load_file(kb_path, rel_path))
+        chunks.extend(
+            {"text": node.get_content(), "source": Path(rel_path).name} for node in nodes
+        )
+    return chunks
+
+
+def _load_file(kb_path: Path, rel_path: str) -> list:
+    return SimpleDirectoryReader(
+        input_files=[str(kb_path / rel_path)],
+        filename_as_id=True,
+    ).load_data()
+
+
 _engine = None
 
 
@@ -0,0 +1,316 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Iterator
+
+import httpx
+
+import config
+
+
+RETRY_STATUSES = frozenset({408, 429, 502, 503, 504})
+EMPTY_RESPONSE = "LLM returned an empty response"
+
+
+class LLMUnavailable(Exception):
+    pass
+
+
+class CircuitOpen(LLMUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = None, reset_after: float = None):
+        self.threshold = threshold or config.LLM_BREAKER_THRESHOLD
+        self.reset_after = config.LLM_BREAKER_RESET if reset_after is None else reset_after
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def available(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                return time.monotonic() - self._opened_at >= self.reset_after
+            return not self._probing
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                self._state = "half_open"
+                self._probing = False
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def status(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == "open":
+                retry_in = max(self.reset_after - (time.monotonic() - self._opened_at), 0.0)
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(retry_in, 1),
+                **self._stats,
+            }
+
+
+class LLMTransport:
+    def __init__(self, base_url: str = None, api_key: str = None, deadline: float = None, breaker: CircuitBreaker = None):
+        self.base_url = base_url or config.LLM_BASE_URL
+        self.api_key = api_key or config.LLM_API_KEY
+        self.deadline = deadline or config.LLM_REQUEST_DEADLINE
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_clients = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(
+                        base_url=self.base_url,
+                        api_key=self.api_key,
+                        max_retries=0,
+                        http_client=httpx.Client(limits=_limits(), timeout=_timeout(self.deadline)),
+                    )
+        return self._client
+
+    @property
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(
+                base_url=self.base_url,
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout(self.deadline)),
+            )
+            with self._lock:
+                self._async_clients = {l: c for l, c in self._async_clients.items() if not l.is_closed()}
+                self._async_clients[loop] = client
+        return client
+
+    def available(self) -> bool:
+        return self.breaker.available()
+
+    def status(self) -> dict:
+        return {"base_url": self.base_url, "deadline": self.deadline, **self.breaker.status()}
+
+    def complete(self, request: dict) -> str:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._admit()
+            try:
+                response = self.client.chat.completions.create(**request, timeout=_timeout(_remaining(deadline)))
+            except Exception as e:
+                delay = self._failed(e, attempt, deadline)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return _content(response)
+
+    async def acomplete(self, request: dict) -> str:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._admit()
+            try:
+                response = await self.async_client.chat.completions.create(
+                    **request, timeout=_timeout(_remaining(deadline)),
+                )
+            except Exception as e:
+                delay = self._failed(e, attempt, deadline)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return _content(response)
+
+    def stream(self, request: dict) -> Iterator[str]:
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._admit()
+            try:
+                stream = self.client.chat.completions.create(
+                    **request, stream=True, timeout=_timeout(_remaining(deadline)),
+                )
+            except Exception as e:
+                delay = self._failed(e, attempt, deadline)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            break
+
+        received = False
+        try:
+            for chunk in stream:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"LLM response exceeded the {self.deadline}s deadline")
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    received = True
+                    yield text
+            if not received:
+                raise LLMUnavailable(EMPTY_RESPONSE)
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            self._record(e)
+            raise LLMUnavailable(_describe(e)) from e
+        else:
+            self.breaker.record_success()
+        finally:
+            stream.close()
+            self.breaker.release()
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            status = self.breaker.status()
+            raise CircuitOpen(
+                f"circuit open after {status['consecutive_failures']} failures, "
+                f"retrying in {status['retry_in']}s"
+            )
+
+    def _failed(self, error: Exception, attempt: int, deadline: float) -> float:
+        self._record(error)
+        if attempt < config.LLM_RETRY_ATTEMPTS and _retryable(error) and self.breaker.available():
+            delay = random.uniform(0, min(config.LLM_RETRY_BACKOFF_MAX, config.LLM_RETRY_BACKOFF * 2 ** attempt))
+            if time.monotonic() + delay < deadline:
+                return delay
+        raise LLMUnavailable(_describe(error)) from error
+
+    def _record(self, error: Exception) -> None:
+        if _server_fault(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+
+def _content(response) -> str:
+    try:
+        content = response.choices[0].message.content
+    except (AttributeError, IndexError, TypeError):
+        content = None
+    if not content:
+        raise LLMUnavailable(EMPTY_RESPONSE)
+    return content
+
+
+def _retryable(error: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+    if isinstance(error, APITimeoutError):
+        return False
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code in RETRY_STATUSES
+
+
+def _server_fault(error: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(error, (APIConnectionError, TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code >= 500 or error.status_code in RETRY_STATUSES)
+
+
+def _describe(error: Exception) -> str:
+    from openai import APITimeoutError
+
+    if isinstance(error, APITimeoutError):
+        return "request timed out"
+    return str(error) or type(error).__name__
+
+
+def _remaining(deadline: float) -> float:
+    return max(deadline - time.monotonic(), 0.001)
+
+
+def _timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=min(config.LLM_CONNECT_TIMEOUT, seconds))
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.LLM_POOL_CONNECTIONS,
+        max_keepalive_connections=config.LLM_POOL_KEEPALIVE,
+        keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> LLMTransport:
+    global _transport
+    with _transport_lock:
+        if _transport is None or _transport.base_url != config.LLM_BASE_URL:
+            _transport = LLMTransport()
+    return _transport
+
+
+if __name__ == "__main__":
+    transport = get_transport()
+    request = {
+        "model": config.LLM_MODEL,
+        "messages": [{"role": "user", "content": "Reply with OK."}],
+        "max_tokens": 5,
+    }
+    for _ in range(config.LLM_BREAKER_THRESHOLD + 2):
+        started = time.perf_counter()
+        try:
+            reply = transport.complete(request)
+        except LLMUnavailable as e:
+            reply = f"unavailable: {e}"
+        print(f"{(time.perf_counter() - started) * 1000:7.1f}ms  {reply}")
+    print(transport.status())
@@ -0,0 +1,172 @@
+import json
+import os
+import uuid
+from bisect import bisect_right
+from pathlib import Path
+
+import numpy as np
+
+
+META_FILE = "meta.json"
+MATRIX_FILE = "embeddings.bin"
+SCALES_FILE = "scales.bin"
+TEXT_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.bin"
+DATA_FILES = (MATRIX_FILE, SCALES_FILE, TEXT_FILE, OFFSETS_FILE)
+
+
+class MatrixVectorStore:
+    def __init__(self, matrix, scales, text_blob, offsets, files: list[dict]):
+        self.matrix = matrix
+        self.scales = scales
+        self.dtype = "int8" if matrix.dtype == np.int8 else "float32"
+        self._text_blob = text_blob
+        self._offsets = offsets
+        self.files = files
+        self._starts = [f["start"] for f in files]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def hashes(self) -> dict:
+        return {f["path"]: f["hash"] for f in self.files}
+
+    @classmethod
+    def build(cls, parts: list[tuple[dict, list[str], np.ndarray]], dtype: str = "float32"):
+        files = []
+        texts = []
+        rows = []
+        for info, chunk_texts, embeddings in parts:
+            start = len(texts)
+            texts.extend(chunk_texts)
+            if len(chunk_texts):
+                rows.append(np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_texts), -1))
+            files.append({**info, "start": start, "end": len(texts)})
+
+        dim = rows[0].shape[1] if rows else 0
+        matrix = np.concatenate(rows) if rows else np.zeros((0, dim), dtype=np.float32)
+        matrix = _normalize(matrix)
+
+        if dtype == "int8":
+            scales = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+            scales[scales == 0] = 1.0
+            matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+        else:
+            scales = None
+
+        encoded = [t.encode("utf-8") for t in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        text_blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return cls(matrix, scales, text_blob, offsets, files)
+
+    @classmethod
+    def load(cls, path: str) -> "MatrixVectorStore":
+        path = Path(path)
+        meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+        count, dim = meta["count"], meta["dim"]
+        dtype = np.int8 if meta["dtype"] == "int8" else np.float32
+
+        generation = meta.get("generation")
+
+        matrix = _memmap(path / _versioned(MATRIX_FILE, generation), dtype, (count, dim))
+        scales = None
+        if meta["dtype"] == "int8":
+            scales = _memmap(path / _versioned(SCALES_FILE, generation), np.float32, (count,))
+        offsets = _memmap(path / _versioned(OFFSETS_FILE, generation), np.int64, (count + 1,))
+        text_blob = _memmap(path / _versioned(TEXT_FILE, generation), np.uint8, (int(offsets[-1]),))
+
+        return cls(matrix, scales, text_blob, offsets, meta["files"])
+
+    def save(self, path: str) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+
+        (path / _versioned(MATRIX_FILE, generation)).write_bytes(np.ascontiguousarray(self.matrix).tobytes())
+        if self.scales is not None:
+            (path / _versioned(SCALES_FILE, generation)).write_bytes(np.ascontiguousarray(self.scales).tobytes())
+        (path / _versioned(OFFSETS_FILE, generation)).write_bytes(np.ascontiguousarray(self._offsets).tobytes())
+        (path / _versioned(TEXT_FILE, generation)).write_bytes(np.ascontiguousarray(self._text_blob).tobytes())
+
+        meta = {
+            "count": len(self),
+            "dim": self.matrix.shape[1],
+            "dtype": self.dtype,
+            "generation": generation,
+            "files": self.files,
+        }
+        _write_atomic(path / META_FILE, json.dumps(meta, indent=2).encode("utf-8"))
+        _prune_generations(path, generation)
+
+    def search(self, queries, top_k: int) -> list[list[tuple[int, float]]]:
+        q = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if len(self) == 0:
+            return [[] for _ in range(q.shape[0])]
+
+        scores = self.matrix @ q.T
+        if self.scales is not None:
+            scores *= self.scales[:, None]
+
+        k = min(top_k, len(self))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+
+        results = []
+        for col in range(q.shape[0]):
+            rows = top[:, col]
+            rows = rows[np.argsort(-scores[rows, col])]
+            results.append([(int(r), float(scores[r, col])) for r in rows])
+        return results
+
+    def text(self, row: int) -> str:
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return bytes(self._text_blob[start:end]).decode("utf-8")
+
+    def source(self, row: int) -> str:
+        return self.files[bisect_right(self._starts, row) - 1]["source"]
+
+    def embeddings(self, start: int, end: int) -> np.ndarray:
+        rows = np.asarray(self.matrix[start:end], dtype=np.float32)
+        if self.scales is not None:
+            rows = rows * self.scales[start:end, None]
+        return rows
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def _memmap(path: Path, dtype, shape: tuple):
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _versioned(name: str, generation: str = None) -> str:
+    if generation is None:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{generation}{ext}"
+
+
+def _prune_generations(path: Path, keep: str) -> None:
+    current = {_versioned(name, keep) for name in DATA_FILES}
+    for name in DATA_FILES:
+        stem, ext = os.path.splitext(name)
+        for old in path.glob(f"{stem}*{ext}"):
+            if old.name in current:
+                continue
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Optional
+
+import config
+
+
+class RAGWarmup:
+    def __init__(self, backend: str = None, mode: str = None):
+        self.backend = backend
+        self.mode = mode
+        self.engine = None
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.elapsed: Optional[float] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "failed"
+
+    def start(self) -> "RAGWarmup":
+        with self._lock:
+            if self._thread is None:
+                self.status = "loading"
+                self._thread = threading.Thread(
+                    target=self._run, name="shield-rag-warmup", daemon=True,
+                )
+                self._thread.start()
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        self.start()
+        self._done.wait(timeout)
+        return self.ready
+
+    def retrieve(self, query: str, top_k: int = None) -> list[dict]:
+        if not self.ready:
+            return []
+        return self.engine.retrieve(query, top_k=top_k)
+
+    def retrieve_batch(self, queries: list[str], top_k: int = None) -> list[list[dict]]:
+        if not self.ready:
+            return [[] for _ in queries]
+        return self.engine.retrieve_batch(queries, top_k=top_k)
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            from pipeline.rag import RAGEngine
+
+            engine = RAGEngine(backend=self.backend, mode=self.mode)
+            engine.build_index()
+            engine.retrieve(config.RAG_WARMUP_QUERY, top_k=1)
+            self.engine = engine
+            self.status = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+            print(f"RAG warm-up failed: {e}")
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self._done.set()
+        print(f"RAG warm-up {self.status} in {self.elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    warmup = RAGWarmup().start()
+    print(f"Status: {warmup.status}")
+    warmup.wait()
+    print(f"Status: {warmup.status} ({warmup.elapsed:.2f}s)")
+    for r in warmup.retrieve("Share your OTP for verification", top_k=3):
+        print(f"  (score: {r['score']:.3f}) {r['source']}")
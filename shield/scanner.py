@@ -0,0 +1,275 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, Optional
+
+import config
+from pipeline.analyzer import FraudAnalyzer
+
+
+_TAIL_BLOCK = 64 * 1024
+
+_worker_analyzer = None
+_worker_full = False
+
+
+def iter_records(path: str, fmt: str, message_field: str, sender_field: str, id_field: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (_parse_json_line(line) for line in f if line.strip())
+
+        for offset, row in enumerate(rows):
+            message = _text_field(row.get(message_field))
+            sender_id = _text_field(row.get(sender_field))
+            record = {
+                "offset": offset,
+                "id": row.get(id_field),
+                "message": message or "",
+                "sender_id": sender_id or None,
+            }
+            if "_error" in row:
+                record["error"] = row["_error"]
+            elif message is None:
+                record["error"] = f"Field '{message_field}' must be a string"
+            elif sender_id is None:
+                record["error"] = f"Field '{sender_field}' must be a string"
+            yield record
+
+
+def resume_offset(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "rb+") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0 and tail.count(b"\n") < 2:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+
+        cut = tail.rfind(b"\n") + 1
+        if cut < len(tail):
+            f.truncate(pos + cut)
+        if cut == 0:
+            return 0
+
+        last = tail[:cut].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        return json.loads(last)["offset"] + 1
+
+
+def scan(
+    input_path: str,
+    output_path: str,
+    fmt: str = None,
+    start: int = 0,
+    workers: int = None,
+    chunk_size: int = None,
+    llm: bool = False,
+    full: bool = False,
+    message_field: str = "message",
+    sender_field: str = "sender_id",
+    id_field: str = "id",
+) -> int:
+    fmt = fmt or ("csv" if input_path.endswith(".csv") else "jsonl")
+    workers = workers or config.SCANNER_WORKERS or os.cpu_count() or 1
+    chunk_size = chunk_size or config.SCANNER_CHUNK_SIZE
+
+    records = islice(iter_records(input_path, fmt, message_field, sender_field, id_field), start, None)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+
+    progress = _Progress(start)
+    with open(output_path, "a" if start else "w", encoding="utf-8") as out:
+        if llm:
+            analyzer = FraudAnalyzer()
+            for chunk in chunks:
+                progress.update(_write(out, _scan_llm_chunk(analyzer, chunk, full)))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(full,),
+            ) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_scan_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        progress.update(_write(out, pending.popleft().result()))
+                while pending:
+                    progress.update(_write(out, pending.popleft().result()))
+
+    progress.finish()
+    return progress.count
+
+
+class _Progress:
+    def __init__(self, start: int):
+        self.start = start
+        self.count = 0
+        self.started = time.perf_counter()
+        self._next_report = config.SCANNER_CHUNK_SIZE * 20
+
+    def update(self, written: int) -> None:
+        self.count += written
+        if self.count >= self._next_report:
+            self._next_report += config.SCANNER_CHUNK_SIZE * 20
+            self._report()
+
+    def finish(self) -> None:
+        self._report()
+
+    def _report(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed else 0.0
+        print(f"Scanned {self.count} messages from offset {self.start} ({rate:.0f} msg/s)")
+
+
+def _init_worker(full: bool) -> None:
+    global _worker_analyzer, _worker_full
+    _worker_analyzer = FraudAnalyzer()
+    _worker_full = full
+
+
+def _scan_chunk(chunk: list[dict]) -> list[dict]:
+    return [_scan_record(_worker_analyzer, record, _worker_full) for record in chunk]
+
+
+def _scan_record(analyzer: FraudAnalyzer, record: dict, full: bool) -> dict:
+    error = _record_error(record)
+    if error:
+        return error
+    try:
+        result = analyzer.analyze_tools(record["message"], record["sender_id"])
+    except Exception as e:
+        return _error_record(record, f"Tool analysis failed: {e}")
+    return _verdict_record(record, result, full)
+
+
+def _scan_llm_chunk(analyzer: FraudAnalyzer, chunk: list[dict], full: bool) -> list[dict]:
+    valid = [record for record in chunk if not _record_error(record)]
+    results = iter(analyzer.analyze_batch(
+        [record["message"] for record in valid],
+        [record["sender_id"] for record in valid],
+    ))
+
+    verdicts = []
+    for record in chunk:
+        error = _record_error(record)
+        if error:
+            verdicts.append(error)
+            continue
+        result = next(results)
+        if "error" in result:
+            verdicts.append(_error_record(record, result["error"]))
+            continue
+        verdict = _verdict_record(record, result, full)
+        verdict.update({
+            "fast_path": result["fast_path"],
+            "degraded": result["degraded"],
+            "model_used": result["model_used"],
+            "rag_sources": result["rag_sources"],
+            "llm_analysis": result["llm_analysis"],
+        })
+        verdicts.append(verdict)
+    return verdicts
+
+
+def _verdict_record(record: dict, result: dict, full: bool) -> dict:
+    tools = result["tool_results"]
+    urgency = tools["urgency_analysis"]
+    verdict = {
+        "offset": record["offset"],
+        "id": record["id"],
+        "sender_id": record["sender_id"],
+        "combined_tool_risk": result["combined_tool_risk"],
+        "category": result.get("category"),
+        "url_risk": tools["url_analysis"]["overall_risk"],
+        "sender_risk": tools["sender_verification"]["risk_score"],
+        "urgency_level": urgency["level"],
+        "urgency_score": urgency["score"],
+        "pin_otp_requested": urgency["pin_otp_requested"],
+        "tactics": urgency["tactic_categories"],
+    }
+    if full:
+        verdict["tool_results"] = tools
+    return verdict
+
+
+def _record_error(record: dict) -> dict:
+    if "error" in record:
+        return _error_record(record, record["error"])
+    if not record["message"]:
+        return _error_record(record, "Empty message")
+    return None
+
+
+def _error_record(record: dict, error: str) -> dict:
+    return {"offset": record["offset"], "id": record["id"], "error": error}
+
+
+def _write(out, verdicts: list[dict]) -> int:
+    out.write("".join(json.dumps(v, ensure_ascii=False) + "\n" for v in verdicts))
+    out.flush()
+    return len(verdicts)
+
+
+def _text_field(value) -> Optional[str]:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _parse_json_line(line: str) -> dict:
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        return {"_error": f"Invalid JSON: {e}"}
+    return row if isinstance(row, dict) else {"_error": "Record is not a JSON object"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan an SMS export with SHIELD and write JSONL verdicts")
+    parser.add_argument("input", help="CSV or JSONL file, one message per record")
+    parser.add_argument("output", help="JSONL file to write verdicts to")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--message-field", default="message")
+    parser.add_argument("--sender-field", default="sender_id")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--start-offset", type=int, default=0)
+    parser.add_argument("--resume", action="store_true", help="continue after the last verdict in OUTPUT")
+    parser.add_argument("--llm", action="store_true", help="also run the LLM on messages the fast path cannot settle")
+    parser.add_argument("--llm-concurrency", type=int)
+    parser.add_argument("--full", action="store_true", help="include the full tool results in each verdict")
+    args = parser.parse_args()
+
+    if args.llm_concurrency:
+        config.LLM_MAX_CONCURRENCY = args.llm_concurrency
+
+    start = resume_offset(args.output) if args.resume else args.start_offset
+    if start:
+        print(f"Resuming {args.input} from offset {start}")
+
+    scan(
+        args.input, args.output,
+        fmt=args.format,
+        start=start,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        llm=args.llm,
+        full=args.full,
+        message_field=args.message_field,
+        sender_field=args.sender_field,
+        id_field=args.id_field,
+    )
@@ -0,0 +1,218 @@
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import config
+from pipeline.analyzer import FraudAnalyzer
+from pipeline.warmup import RAGWarmup
+
+
+class Overloaded(Exception):
+    pass
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisService:
+    def __init__(self, workers: int = None, queue_size: int = None):
+        self.workers = workers or config.SERVER_WORKERS
+        self.capacity = self.workers + (config.SERVER_QUEUE_SIZE if queue_size is None else queue_size)
+        self.rag = RAGWarmup().start()
+        self.analyzer = FraudAnalyzer(rag_engine=self.rag)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shield-worker")
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._used = 0
+        self._stats = {"completed": 0, "rejected": 0, "failed": 0}
+
+    def analyze(self, message: str, sender_id: str = None) -> dict:
+        return self._run(self.analyzer.analyze, message, sender_id)
+
+    def analyze_batch(self, messages: list[str], sender_ids: list[str] = None) -> list[dict]:
+        return self._run(self.analyzer.analyze_batch, messages, sender_ids, weight=len(messages))
+
+    def health(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "rag_status": self.rag.status,
+                "rag_ready": self.rag.ready,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "inflight": self._inflight,
+                "slots_used": self._used,
+                "llm": self.analyzer.llm.status(),
+                **self._stats,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args, weight: int = 1):
+        weight = min(weight, self.capacity)
+        with self._lock:
+            if self._used + weight > self.capacity:
+                self._stats["rejected"] += 1
+                raise Overloaded()
+            self._used += weight
+            self._inflight += 1
+
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._release(weight))
+
+        try:
+            result = future.result(timeout=config.SERVER_REQUEST_TIMEOUT)
+        except FutureTimeout:
+            raise HTTPError(504, "Analysis timed out")
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise HTTPError(500, f"Analysis failed: {e}")
+
+        with self._lock:
+            self._stats["completed"] += 1
+        return result
+
+    def _release(self, weight: int) -> None:
+        with self._lock:
+            self._inflight -= 1
+            self._used -= weight
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service: AnalysisService = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.service.health())
+        elif self.path == "/ready":
+            status = self.service.rag.status
+            self._send(503 if status == "loading" else 200, {
+                "ready": status != "loading",
+                "rag_status": status,
+            })
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        try:
+            if self.path == "/analyze":
+                body = self._read_json()
+                message = _require_text(body.get("message"), "message")
+                sender_id = _optional_text(body.get("sender_id"), "sender_id")
+                self._send(200, self.service.analyze(message, sender_id))
+            elif self.path == "/analyze/batch":
+                body = self._read_json()
+                messages, sender_ids = _parse_batch(body)
+                self._send(200, {"results": self.service.analyze_batch(messages, sender_ids)})
+            else:
+                self.close_connection = True
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+        except Overloaded:
+            self._send(503, {"error": "Server busy, retry later"}, {"Retry-After": "1"})
+        except HTTPError as e:
+            self._send(e.status, {"error": str(e)})
+        except Exception as e:
+            print(f"Unhandled error on {self.path}: {e}")
+            self.close_connection = True
+            self._send(500, {"error": "Internal server error"})
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise HTTPError(400, "Content-Length must be a non-negative integer")
+        if length > config.SERVER_MAX_BODY_BYTES:
+            self.close_connection = True
+            raise HTTPError(413, f"Request body exceeds {config.SERVER_MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(400, "Request body must be valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    def _send(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _require_text(value, field: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{field}' must be a non-empty string")
+    return value.strip()
+
+
+def _optional_text(value, field: str) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise HTTPError(400, f"'{field}' must be a string")
+    return value.strip() or None
+
+
+def _parse_batch(body: dict) -> tuple[list[str], list[str]]:
+    messages = body.get("messages")
+    if not isinstance(messages, list) or not messages:
+        raise HTTPError(400, "'messages' must be a non-empty list")
+    if len(messages) > config.SERVER_BATCH_MAX:
+        raise HTTPError(413, f"Batch exceeds {config.SERVER_BATCH_MAX} messages")
+
+    sender_ids = body.get("sender_ids")
+    if sender_ids is not None and (not isinstance(sender_ids, list) or len(sender_ids) != len(messages)):
+        raise HTTPError(400, "'sender_ids' must be a list with one entry per message")
+
+    if sender_ids is not None:
+        sender_ids = [_optional_text(s, "sender_ids[]") for s in sender_ids]
+
+    return [_require_text(m, "messages[]") for m in messages], sender_ids
+
+
+def create_server(host: str = None, port: int = None, workers: int = None, queue_size: int = None) -> ThreadingHTTPServer:
+    service = AnalysisService(workers=workers, queue_size=queue_size)
+    handler = type("Handler", (AnalysisHandler,), {"service": service})
+    server = ThreadingHTTPServer((host or config.SERVER_HOST, port or config.SERVER_PORT), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SHIELD headless analysis server")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=config.SERVER_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers, args.queue_size)
+    print(f"SHIELD server listening on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.service.shutdown()
+        server.server_close()
@@ -1 +1 @@
-__all__ = ["url_analyzer", "sender_verifier", "urgency_classifier"]
+__all__ = ["url_analyzer", "sender_verifier", "urgency_classifier", "phrase_matcher", "domain_index", "sender_index", "sender_registry", "batch_scorer"]
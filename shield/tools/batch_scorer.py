@@ -0,0 +1,92 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from tools.sender_verifier import sender_risk_score
+from tools.urgency_classifier import TACTIC_BITS, decode_tactics, urgency_scores
+from tools.url_analyzer import url_risk_score
+
+
+COLUMNS = ("url_risk", "sender_risk", "urgency_score", "pin_otp", "tactics", "combined_risk")
+
+
+def score_batch(messages: Iterable[str], sender_ids: Optional[Iterable[Optional[str]]] = None) -> dict:
+    messages = list(messages)
+    n = len(messages)
+    if sender_ids is None:
+        sender_ids = [None] * n
+    else:
+        sender_ids = list(sender_ids)
+        if len(sender_ids) != n:
+            raise ValueError("sender_ids must be the same length as messages")
+
+    url_risk = np.zeros(n, dtype=np.uint8)
+    sender_risk = np.zeros(n, dtype=np.uint8)
+    urgency_score = np.zeros(n, dtype=np.uint8)
+    pin_otp = np.zeros(n, dtype=bool)
+    tactics = np.zeros(n, dtype=np.uint16 if len(TACTIC_BITS) <= 16 else np.uint32)
+
+    sender_memo = {}
+    for i, (message, sender_id) in enumerate(zip(messages, sender_ids)):
+        if not isinstance(message, str):
+            message = ""
+        if not isinstance(sender_id, str):
+            sender_id = None
+        url_risk[i] = url_risk_score(message)
+        sender_risk[i] = sender_risk_score(message, sender_id, sender_memo)
+        urgency_score[i], pin_otp[i], tactics[i] = urgency_scores(message.lower())
+
+    return {
+        "url_risk": url_risk,
+        "sender_risk": sender_risk,
+        "urgency_score": urgency_score,
+        "pin_otp": pin_otp,
+        "tactics": tactics,
+        "combined_risk": combined_risk(url_risk, sender_risk, urgency_score, pin_otp),
+    }
+
+
+def combined_risk(url_risk, sender_risk, urgency_score, pin_otp) -> np.ndarray:
+    url = np.asarray(url_risk, dtype=np.int16)
+    sender = np.asarray(sender_risk, dtype=np.int16)
+    urgency = np.asarray(urgency_score, dtype=np.int16)
+
+    combined = np.maximum(np.maximum(url, sender), urgency)
+    combined += np.where((url > 0) & (urgency > 0), 15, 0).astype(np.int16)
+    np.minimum(combined, 100, out=combined)
+    combined += np.where((url > 0) & (sender > 0), 10, 0).astype(np.int16)
+    np.minimum(combined, 100, out=combined)
+    combined[np.asarray(pin_otp, dtype=bool)] = 100
+
+    return combined.astype(np.uint8)
+
+
+def tactic_names(mask: int) -> list[str]:
+    return decode_tactics(int(mask))
+
+
+if __name__ == "__main__":
+    import time
+
+    from pipeline.analyzer import FraudAnalyzer
+
+    messages = [
+        "Dear SBI customer, your account will be blocked in 24hrs. "
+        "Update KYC immediately: http://bit.ly/sbi-kyc-update",
+        "Your a/c no. XXXXXXX1234 is credited by Rs.5,000.00 on 21-Feb-26. Avl Bal Rs.25,430.50 -SBI",
+        "This is CBI calling. An arrest warrant has been issued against you.",
+        "Share your OTP to receive the refund",
+    ]
+    sender_ids = [None, "SBIBNK", None, "SB1BNK"]
+
+    started = time.perf_counter()
+    scores = score_batch(messages * 2500, sender_ids * 2500)
+    elapsed = time.perf_counter() - started
+    print(f"Scored {len(scores['combined_risk'])} messages in {elapsed:.2f}s")
+
+    analyzer = FraudAnalyzer(cache=None)
+    for i, (message, sender_id) in enumerate(zip(messages, sender_ids)):
+        print(f"\n{message[:60]}...")
+        print({column: scores[column][i].item() for column in COLUMNS})
+        print(f"  tactics: {tactic_names(scores['tactics'][i])}")
+        print(f"  analyzer combined: {analyzer.analyze_tools(message, sender_id)['combined_tool_risk']}")
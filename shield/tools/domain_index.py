@@ -0,0 +1,79 @@
+import csv
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.values: list[Any] = []
+
+
+class DomainIndex:
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, domain: str) -> bool:
+        node = self._find(domain)
+        return node is not None and bool(node.values)
+
+    def add(self, domain: str, value: Any = None) -> None:
+        node = self._root
+        for label in reversed(_labels(domain)):
+            child = node.children.get(label)
+            if child is None:
+                child = _Node()
+                node.children[label] = child
+            node = child
+        if not node.values:
+            self._size += 1
+        node.values.append(domain.lower().strip(".") if value is None else value)
+
+    def iter_suffix_matches(self, host: str) -> Iterator[tuple[str, Any]]:
+        labels = _labels(host)
+        node = self._root
+        for depth in range(len(labels) - 1, -1, -1):
+            node = node.children.get(labels[depth])
+            if node is None:
+                return
+            if node.values:
+                suffix = ".".join(labels[depth:])
+                for value in node.values:
+                    yield suffix, value
+
+    def longest_match(self, host: str) -> Optional[tuple[str, Any]]:
+        best = None
+        for match in self.iter_suffix_matches(host):
+            best = match
+        return best
+
+    def _find(self, domain: str) -> Optional[_Node]:
+        node = self._root
+        for label in reversed(_labels(domain)):
+            node = node.children.get(label)
+            if node is None:
+                return None
+        return node
+
+
+def read_domain_csv(path: str, value_field: str = None) -> list[tuple[str, Optional[str]]]:
+    entries = []
+    with open(Path(path), newline="", encoding="utf-8") as f:
+        rows = (line for line in f if line.strip() and not line.lstrip().startswith("#"))
+        for row in csv.DictReader(rows):
+            domain = (row.get("domain") or "").strip().lower()
+            if not domain:
+                continue
+            value = (row.get(value_field) or "").strip().lower() if value_field else None
+            entries.append((domain, value or None))
+    return entries
+
+
+def _labels(domain: str) -> list[str]:
+    return [label for label in domain.lower().strip(".").split(".") if label]
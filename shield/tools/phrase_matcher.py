@@ -0,0 +1,57 @@
+from collections import deque
+from typing import Any, Iterator
+
+
+class PhraseMatcher:
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._terminal: list[list[tuple[int, Any]]] = [[]]
+        self._fail: list[int] = []
+        self._out: list[list[tuple[int, Any]]] = []
+        self._built = False
+
+    def add(self, phrase: str, payload: Any) -> None:
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._terminal.append([])
+            node = nxt
+        self._terminal[node].append((len(phrase), payload))
+        self._built = False
+
+    def build(self) -> None:
+        goto = self._goto
+        fail = [0] * len(goto)
+        out = [list(t) for t in self._terminal]
+
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._fail = fail
+        self._out = out
+        self._built = True
+
+    def finditer(self, text: str) -> Iterator[tuple[int, Any]]:
+        if not self._built:
+            self.build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, payload in out[node]:
+                yield i - length + 1, payload
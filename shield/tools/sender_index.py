@@ -0,0 +1,91 @@
+import math
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Iterable
+
+
+CONFUSABLES = str.maketrans({
+    "0": "O", "Q": "O",
+    "1": "I", "L": "I",
+    "2": "Z",
+    "3": "E",
+    "4": "A",
+    "5": "S",
+    "6": "G",
+    "7": "T",
+    "8": "B",
+})
+
+
+def skeleton(sender_id: str) -> str:
+    return sender_id.upper().translate(CONFUSABLES)
+
+
+class SenderIndex:
+    def __init__(self, sender_ids: Iterable[str] = ()):
+        self._ids: list[str] = []
+        self._skeletons: list[str] = []
+        self._postings: dict[int, dict[str, list[int]]] = {}
+        for sender_id in sender_ids:
+            self.add(sender_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, sender_id: str) -> None:
+        sender_id = sender_id.upper()
+        idx = len(self._ids)
+        skel = skeleton(sender_id)
+        self._ids.append(sender_id)
+        self._skeletons.append(skel)
+        postings = self._postings.setdefault(len(skel), defaultdict(list))
+        for token in _tokens(skel):
+            postings[token].append(idx)
+
+    def closest(self, sender_id: str, threshold: float = 0.6, limit: int = 1) -> list[tuple[str, float]]:
+        sender_id = sender_id.upper()
+        skel = skeleton(sender_id)
+        tokens = _tokens(skel)
+
+        scored = []
+        for length, postings in self._postings.items():
+            min_shared = _min_matches(len(skel), length, threshold)
+            if min_shared > min(len(skel), length):
+                continue
+
+            shared = Counter()
+            for token in tokens:
+                shared.update(postings.get(token, ()))
+
+            for idx, count in shared.items():
+                if count < min_shared:
+                    continue
+                score = max(
+                    _ratio(sender_id, self._ids[idx], threshold),
+                    _ratio(skel, self._skeletons[idx], threshold),
+                )
+                if score >= threshold:
+                    scored.append((self._ids[idx], score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+
+def _tokens(text: str) -> list[str]:
+    seen = defaultdict(int)
+    tokens = []
+    for char in text:
+        tokens.append(f"{char}{seen[char]}")
+        seen[char] += 1
+    return tokens
+
+
+def _min_matches(a_len: int, b_len: int, threshold: float) -> int:
+    return math.ceil(threshold * (a_len + b_len) / 2 - 1e-9)
+
+
+def _ratio(a: str, b: str, threshold: float) -> float:
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
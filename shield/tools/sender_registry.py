@@ -0,0 +1,107 @@
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import config
+from tools.sender_index import SenderIndex
+
+
+class SenderRegistry:
+    __slots__ = ("version", "banks", "id_to_bank", "ids", "index")
+
+    def __init__(self, version: str, senders: dict):
+        names = {}
+        id_to_bank = {}
+        for bank, info in senders.items():
+            bank = sys.intern(bank.lower())
+            full_name = sys.intern(info["full_name"])
+            names[bank] = full_name
+            for sid in info["sender_ids"]:
+                id_to_bank[sys.intern(sid.upper().strip())] = full_name
+
+        self.version = version
+        self.banks = names
+        self.id_to_bank = id_to_bank
+        self.ids = frozenset(id_to_bank)
+        self.index = SenderIndex(sorted(self.ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def load_registry(path: str) -> SenderRegistry:
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()[:12]
+
+    if path.endswith(".csv"):
+        senders = {}
+        lines = raw.decode("utf-8").splitlines()
+        rows = (line for line in lines if line.strip() and not line.lstrip().startswith("#"))
+        for row in csv.DictReader(rows):
+            entry = senders.setdefault(row["bank"].strip(), {
+                "full_name": row["full_name"].strip(),
+                "sender_ids": [],
+            })
+            entry["sender_ids"].append(row["sender_id"])
+        return SenderRegistry(digest, senders)
+
+    data = json.loads(raw)
+    version = data.get("version")
+    return SenderRegistry(f"{version}-{digest}" if version else digest, data["senders"])
+
+
+def _resolve(path: str) -> str:
+    return str(Path(__file__).resolve().parent.parent / path)
+
+
+_lock = threading.Lock()
+_registry: Optional[SenderRegistry] = None
+_signature = None
+_last_check = 0.0
+
+
+def get_registry() -> SenderRegistry:
+    global _last_check
+
+    now = time.monotonic()
+    if _registry is not None and now - _last_check < config.SENDER_REGISTRY_RELOAD_INTERVAL:
+        return _registry
+
+    with _lock:
+        if _registry is None or now - _last_check >= config.SENDER_REGISTRY_RELOAD_INTERVAL:
+            _last_check = now
+            _reload_if_changed()
+    return _registry
+
+
+def _reload_if_changed() -> None:
+    global _registry, _signature
+
+    path = _resolve(config.SENDER_REGISTRY_PATH)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if _registry is None:
+            raise FileNotFoundError(f"Sender registry not found at {path}")
+        return
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if signature == _signature and _registry is not None:
+        return
+    _signature = signature
+
+    try:
+        registry = load_registry(path)
+    except Exception as e:
+        if _registry is None:
+            raise
+        print(f"Sender registry reload failed, keeping version {_registry.version}: {e}")
+        return
+
+    _registry = registry
@@ -1,119 +1,29 @@
 import re
-from difflib import SequenceMatcher
 from typing import Optional
 
+from tools.sender_registry import SenderRegistry, get_registry
 
-LEGITIMATE_SENDERS = {
-    "sbi": {
-        "sender_ids": [
-            "SBIBNK", "SBIPSG", "SBIINB", "SBIYNO", "SBIUNO",
-            "SBISMA", "SBIBIN", "ATMSBI",
-        ],
-        "full_name": "State Bank of India",
-    },
-    "hdfc": {
-        "sender_ids": [
-            "HDFCBK", "HLOANS", "HDFCBN", "HDFCSB",
-        ],
-        "full_name": "HDFC Bank",
-    },
-    "icici": {
-        "sender_ids": [
-            "ICICIB", "ICICBA", "ICICIS", "ICICIP",
-        ],
-        "full_name": "ICICI Bank",
-    },
-    "axis": {
-        "sender_ids": [
-            "AXISBK", "AXISMB", "AXISBN",
-        ],
-        "full_name": "Axis Bank",
-    },
-    "kotak": {
-        "sender_ids": [
-            "KOTAKB", "KOTMAH", "KOTAK8",
-        ],
-        "full_name": "Kotak Mahindra Bank",
-    },
-    "pnb": {
-        "sender_ids": [
-            "PNBSMS", "PNBBNK",
-        ],
-        "full_name": "Punjab National Bank",
-    },
-    "bob": {
-        "sender_ids": [
-            "BOBTXN", "BOBSMS", "BBRODR",
-        ],
-        "full_name": "Bank of Baroda",
-    },
-    "canara": {
-        "sender_ids": [
-            "CANBNK", "CANBSM",
-        ],
-        "full_name": "Canara Bank",
-    },
-    "union": {
-        "sender_ids": [
-            "UBIOBC", "UBIBNK",
-        ],
-        "full_name": "Union Bank of India",
-    },
-    "idbi": {
-        "sender_ids": [
-            "IDBIBK", "IDBISM",
-        ],
-        "full_name": "IDBI Bank",
-    },
-    "paytm": {
-        "sender_ids": [
-            "PYTM", "PAYTMB", "PAYTMS",
-        ],
-        "full_name": "Paytm / Paytm Payments Bank",
-    },
-    "phonepe": {
-        "sender_ids": [
-            "PHONPE", "PHPHPE",
-        ],
-        "full_name": "PhonePe",
-    },
-    "gpay": {
-        "sender_ids": [
-            "GOOGLE", "GGLPAY",
-        ],
-        "full_name": "Google Pay",
-    },
-    "npci": {
-        "sender_ids": [
-            "NPCITX", "UPIBNK",
-        ],
-        "full_name": "National Payments Corporation of India",
-    },
-    "rbi": {
-        "sender_ids": [
-            "RBIBNK", "RBISAY",
-        ],
-        "full_name": "Reserve Bank of India",
-    },
-}
-
-ALL_LEGITIMATE_IDS = set()
-ID_TO_BANK = {}
-for bank, info in LEGITIMATE_SENDERS.items():
-    for sid in info["sender_ids"]:
-        ALL_LEGITIMATE_IDS.add(sid.upper())
-        ID_TO_BANK[sid.upper()] = info["full_name"]
+
+SENDER_PATTERNS = [
+    (re.compile(r'^(?:AD|TD|TA|TM|VM|DM|SI)-([A-Z0-9]{4,8})', re.IGNORECASE), "header"),
+    (re.compile(r'\[([A-Z0-9]{4,8})\]', re.IGNORECASE), "body"),
+    (re.compile(r'^From:?\s*([A-Z0-9]{4,8})', re.IGNORECASE), "header"),
+]
 
 
 def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
+    registry = get_registry()
+
+    source = "caller" if sender_id else None
     if not sender_id:
-        sender_id = _extract_sender_id(message)
+        sender_id, source = extract_sender(message)
 
     if not sender_id:
         claimed_bank = _detect_bank_claim(message)
         if claimed_bank:
             return {
                 "sender_detected": None,
+                "sender_source": None,
                 "is_verified": False,
                 "bank_name": None,
                 "risk_score": 35,
@@ -126,6 +36,7 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
             }
         return {
             "sender_detected": None,
+            "sender_source": None,
             "is_verified": False,
             "bank_name": None,
             "risk_score": 0,
@@ -135,10 +46,11 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
 
     sender_upper = sender_id.upper().strip()
 
-    if sender_upper in ALL_LEGITIMATE_IDS:
-        bank_name = ID_TO_BANK[sender_upper]
+    if sender_upper in registry.ids:
+        bank_name = registry.id_to_bank[sender_upper]
         return {
             "sender_detected": sender_upper,
+            "sender_source": source,
             "is_verified": True,
             "bank_name": bank_name,
             "risk_score": 0,
@@ -146,12 +58,12 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
             "summary": f"Verified sender: {sender_upper} belongs to {bank_name}.",
         }
 
-    closest_match, similarity = _find_closest_sender(sender_upper)
+    closest_match, similarity = _find_closest_sender(registry, sender_upper)
     indicators = []
     risk_score = 0
 
     if closest_match and similarity >= 0.7:
-        real_bank = ID_TO_BANK[closest_match]
+        real_bank = registry.id_to_bank[closest_match]
         indicators.append(
             f"Sender '{sender_upper}' is similar to '{closest_match}' ({real_bank}) "
             f"but is NOT an exact match. This could be a typosquatting attempt — "
@@ -159,7 +71,7 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
         )
         risk_score += 60
 
-    claimed_bank = _detect_bank_in_sender(sender_upper)
+    claimed_bank = _detect_bank_in_sender(registry, sender_upper)
     if claimed_bank and not closest_match:
         indicators.append(
             f"Sender ID contains '{claimed_bank}' but is not in our verified "
@@ -186,6 +98,7 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
 
     return {
         "sender_detected": sender_upper,
+        "sender_source": source,
         "is_verified": False,
         "bank_name": None,
         "risk_score": risk_score,
@@ -194,19 +107,26 @@ def verify_sender(message: str, sender_id: Optional[str] = None) -> dict:
     }
 
 
-def _extract_sender_id(message: str) -> Optional[str]:
-    patterns = [
-        r'^(?:AD|TD|TA|TM|VM|DM|SI)-([A-Z0-9]{4,8})',
-        r'\[([A-Z0-9]{4,8})\]',
-        r'^From:?\s*([A-Z0-9]{4,8})',
-    ]
+def sender_risk_score(message: str, sender_id: Optional[str] = None, memo: dict = None) -> int:
+    sender_id = sender_id or extract_sender(message)[0]
+    if not sender_id:
+        return 35 if _detect_bank_claim(message) else 0
+
+    if memo is None:
+        return verify_sender(message, sender_id)["risk_score"]
+    risk = memo.get(sender_id)
+    if risk is None:
+        risk = memo[sender_id] = verify_sender(message, sender_id)["risk_score"]
+    return risk
 
-    for pattern in patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
+
+def extract_sender(message: str) -> tuple[Optional[str], Optional[str]]:
+    for pattern, source in SENDER_PATTERNS:
+        match = pattern.search(message)
         if match:
-            return match.group(1)
+            return match.group(1), source
 
-    return None
+    return None, None
 
 
 def _detect_bank_claim(message: str) -> Optional[str]:
@@ -231,25 +151,17 @@ def _detect_bank_claim(message: str) -> Optional[str]:
     return None
 
 
-def _detect_bank_in_sender(sender_id: str) -> Optional[str]:
+def _detect_bank_in_sender(registry: SenderRegistry, sender_id: str) -> Optional[str]:
     sid_lower = sender_id.lower()
-    for bank_name in LEGITIMATE_SENDERS.keys():
+    for bank_name in registry.banks:
         if bank_name in sid_lower:
             return bank_name
     return None
 
 
-def _find_closest_sender(sender_id: str) -> tuple[Optional[str], float]:
-    best_match = None
-    best_score = 0.0
-
-    for legitimate_id in ALL_LEGITIMATE_IDS:
-        score = SequenceMatcher(None, sender_id, legitimate_id).ratio()
-        if score > best_score:
-            best_score = score
-            best_match = legitimate_id
-
-    return (best_match, best_score) if best_score >= 0.6 else (None, 0.0)
+def _find_closest_sender(registry: SenderRegistry, sender_id: str) -> tuple[Optional[str], float]:
+    matches = registry.index.closest(sender_id, threshold=0.6)
+    return matches[0] if matches else (None, 0.0)
 
 
 if __name__ == "__main__":
@@ -267,7 +179,7 @@ if __name__ == "__main__":
         print(f"\n{'='*60}")
         print(f"Message: {msg[:60]}..." if msg else f"Sender ID: {sid}")
         print(f"Sender: {result['sender_detected']}")
-        print(f"Verified: {result['is_verified']}")
+        print(f"Verified: {result['is_verified']} (sender from {result['sender_source']})")
         if result["bank_name"]:
             print(f"Bank: {result['bank_name']}")
         print(f"Risk: {result['risk_score']}/100")
@@ -1,3 +1,8 @@
+import re
+
+from tools.phrase_matcher import PhraseMatcher
+
+
 URGENCY_PATTERNS = {
     "english": [
         ("immediately", 30, "time_pressure"),
@@ -136,30 +141,86 @@ PIN_OTP_PATTERNS = [
 
 SENSITIVE_KEYWORDS = ["pin", "otp", "cvv", "mpin", "password", "passcode"]
 
+ACTION_WORDS = [
+    "share", "send", "enter", "tell", "give", "provide",
+    "type", "input", "submit", "bhejein", "batayein",
+    "karein", "dijiye", "cheppandi", "ivvandi",
+]
+
+PIN_OTP_TOKEN_WINDOW = 5
+
+_TOKEN_RE = re.compile(r"\w+")
+_SENSITIVE_TOKENS = frozenset(SENSITIVE_KEYWORDS)
+_ACTION_TOKENS = frozenset(ACTION_WORDS)
+
+
+def _build_phrase_matcher() -> PhraseMatcher:
+    matcher = PhraseMatcher()
+    order = 0
+    for language, patterns in URGENCY_PATTERNS.items():
+        for phrase, score, tactic_type in patterns:
+            matcher.add(phrase, (order, phrase, language, score, tactic_type))
+            order += 1
+    for phrase in PIN_OTP_PATTERNS:
+        matcher.add(phrase, (None, phrase, "universal", 100, "credential_theft"))
+    matcher.build()
+    return matcher
+
+
+_PHRASE_MATCHER = _build_phrase_matcher()
+
+TACTIC_BITS = {
+    tactic: 1 << bit
+    for bit, tactic in enumerate(sorted(
+        {tactic for patterns in URGENCY_PATTERNS.values() for _, _, tactic in patterns}
+        | {"credential_theft"}
+    ))
+}
+
+
+def find_phrases(msg_lower: str) -> list[dict]:
+    matches = []
+    for offset, (_, phrase, language, score, tactic_type) in _PHRASE_MATCHER.finditer(msg_lower):
+        matches.append({
+            "phrase": phrase,
+            "language": language,
+            "score": score,
+            "tactic": tactic_type,
+            "offset": offset,
+        })
+    return matches
+
 
 def classify_urgency(message: str) -> dict:
     msg_lower = message.lower()
 
-    pin_otp_requested = _check_pin_otp_request(msg_lower)
+    urgency_hits = {}
+    pin_phrase_found = False
+    for _, payload in _PHRASE_MATCHER.finditer(msg_lower):
+        if payload[0] is None:
+            pin_phrase_found = True
+        elif payload[0] not in urgency_hits:
+            urgency_hits[payload[0]] = payload
+
+    pin_otp_requested = pin_phrase_found or _check_pin_otp_request(msg_lower)
 
     tactics_found = []
     total_score = 0
     tactic_categories = {}
 
-    for language, patterns in URGENCY_PATTERNS.items():
-        for phrase, score, tactic_type in patterns:
-            if phrase in msg_lower:
-                tactics_found.append({
-                    "phrase": phrase,
-                    "language": language,
-                    "score": score,
-                    "tactic": tactic_type,
-                })
-                total_score += score
-
-                if tactic_type not in tactic_categories:
-                    tactic_categories[tactic_type] = 0
-                tactic_categories[tactic_type] += 1
+    for order in sorted(urgency_hits):
+        _, phrase, language, score, tactic_type = urgency_hits[order]
+        tactics_found.append({
+            "phrase": phrase,
+            "language": language,
+            "score": score,
+            "tactic": tactic_type,
+        })
+        total_score += score
+
+        if tactic_type not in tactic_categories:
+            tactic_categories[tactic_type] = 0
+        tactic_categories[tactic_type] += 1
 
     if pin_otp_requested:
         total_score = 100
@@ -197,27 +258,70 @@ def classify_urgency(message: str) -> dict:
     }
 
 
-def _check_pin_otp_request(msg_lower: str) -> bool:
-    for phrase in PIN_OTP_PATTERNS:
-        if phrase in msg_lower:
-            return True
+def urgency_scores(msg_lower: str) -> tuple[int, bool, int]:
+    seen = 0
+    score = 0
+    tactics = 0
+    pin_phrase_found = False
+    for _, payload in _PHRASE_MATCHER.finditer(msg_lower):
+        order = payload[0]
+        if order is None:
+            pin_phrase_found = True
+        elif not seen >> order & 1:
+            seen |= 1 << order
+            score += payload[3]
+            tactics |= TACTIC_BITS[payload[4]]
 
-    action_words = [
-        "share", "send", "enter", "tell", "give", "provide",
-        "type", "input", "submit", "bhejein", "batayein",
-        "karein", "dijiye", "cheppandi", "ivvandi",
-    ]
+    if pin_phrase_found or _check_pin_otp_request(msg_lower):
+        return 100, True, tactics | TACTIC_BITS["credential_theft"]
+    return min(score, 100), False, tactics
 
-    for keyword in SENSITIVE_KEYWORDS:
-        if keyword in msg_lower:
-            for action in action_words:
-                if action in msg_lower:
-                    kw_pos = msg_lower.find(keyword)
-                    act_pos = msg_lower.find(action)
-                    if abs(kw_pos - act_pos) <= 30:
-                        return True
 
-    return False
+def decode_tactics(mask: int) -> list[str]:
+    return [tactic for tactic, bit in TACTIC_BITS.items() if mask & bit]
+
+
+def _check_pin_otp_request(msg_lower: str) -> bool:
+    return len(find_credential_requests(msg_lower)) > 0
+
+
+def find_credential_requests(msg_lower: str, window: int = PIN_OTP_TOKEN_WINDOW) -> list[dict]:
+    keywords = []
+    actions = []
+    for position, match in enumerate(_TOKEN_RE.finditer(msg_lower)):
+        token = match.group()
+        if token in _SENSITIVE_TOKENS:
+            keywords.append((position, token, match.start()))
+        elif token in _ACTION_TOKENS:
+            actions.append((position, token, match.start()))
+
+    if not keywords or not actions:
+        return []
+
+    requests = []
+    j = 0
+    for kw_pos, keyword, kw_offset in keywords:
+        while j < len(actions) and actions[j][0] < kw_pos:
+            j += 1
+
+        nearest = None
+        if j > 0:
+            nearest = actions[j - 1]
+        if j < len(actions) and (
+            nearest is None or actions[j][0] - kw_pos < kw_pos - nearest[0]
+        ):
+            nearest = actions[j]
+
+        if abs(nearest[0] - kw_pos) <= window:
+            requests.append({
+                "keyword": keyword,
+                "action": nearest[1],
+                "keyword_offset": kw_offset,
+                "action_offset": nearest[2],
+                "token_distance": abs(nearest[0] - kw_pos),
+            })
+
+    return requests
 
 
 def _build_summary(level, pin_otp, tactics, categories):
@@ -1,5 +1,11 @@
 import re
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import config
+from tools.domain_index import DomainIndex, read_domain_csv
+from tools.phrase_matcher import PhraseMatcher
 
 
 URL_SHORTENERS = [
@@ -35,6 +41,10 @@ SUSPICIOUS_TLDS = [
     ".icu", ".cam", ".rest",
 ]
 
+SECOND_LEVEL_LABELS = {
+    "co", "com", "net", "org", "gov", "edu", "ac", "nic", "res", "gen", "firm", "ind", "mil",
+}
+
 SUSPICIOUS_PATH_KEYWORDS = [
     "verify", "update", "confirm", "secure", "login",
     "account", "kyc", "refund", "claim", "reward",
@@ -42,6 +52,63 @@ SUSPICIOUS_PATH_KEYWORDS = [
 ]
 
 
+def _build_official_index() -> tuple[DomainIndex, list[str]]:
+    entries = [
+        (domain, owner)
+        for owner, domains in OFFICIAL_BANK_DOMAINS.items()
+        for domain in domains
+    ]
+    if Path(config.DOMAIN_ALLOWLIST_PATH).exists():
+        entries += read_domain_csv(config.DOMAIN_ALLOWLIST_PATH, value_field="owner")
+
+    index = DomainIndex()
+    owners = []
+    for domain, owner in entries:
+        owner = owner or domain.split(".")[0]
+        index.add(domain, owner)
+        if owner not in owners:
+            owners.append(owner)
+    return index, owners
+
+
+def _build_domain_set_index(domains: list[str]) -> DomainIndex:
+    index = DomainIndex()
+    for domain in domains:
+        index.add(domain.lstrip("."), domain)
+    return index
+
+
+_OFFICIAL_INDEX, _OFFICIAL_OWNERS = _build_official_index()
+_SHORTENER_INDEX = _build_domain_set_index(URL_SHORTENERS)
+_SUSPICIOUS_TLD_INDEX = _build_domain_set_index(SUSPICIOUS_TLDS)
+
+_OWNER_ORDER = {owner: order for order, owner in enumerate(_OFFICIAL_OWNERS)}
+_TOKEN_OWNERS = frozenset(_OFFICIAL_OWNERS) - OFFICIAL_BANK_DOMAINS.keys()
+
+_OWNER_MATCHER = PhraseMatcher()
+for _owner in OFFICIAL_BANK_DOMAINS:
+    _OWNER_MATCHER.add(_owner, _owner)
+_OWNER_MATCHER.build()
+
+
+_URL_RE = re.compile(
+    r'(?:(?P<scheme>https?)://|(?<![\w.-])(?=www\.|bit\.ly/|tinyurl\.com/|goo\.gl/|t\.co/))'
+    r'(?P<body>[^\s<>"\')\]]*[^\s<>"\')\].,;:!?])',
+    re.IGNORECASE,
+)
+
+_IPV4_HOST_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+
+
+class ParsedUrl(NamedTuple):
+    url: str
+    lower: str
+    scheme: str
+    host: str
+    port: str
+    path: str
+
+
 def analyze_urls(message: str) -> dict:
     urls = _extract_urls(message)
 
@@ -53,7 +120,7 @@ def analyze_urls(message: str) -> dict:
             "summary": "No URLs found in message.",
         }
 
-    analyses = [_analyze_single_url(url, message) for url in urls]
+    analyses = [_analyze_single_url(parsed) for parsed in urls]
     overall_risk = max(a["risk_score"] for a in analyses)
 
     if overall_risk >= 80:
@@ -73,122 +140,160 @@ def analyze_urls(message: str) -> dict:
     }
 
 
-def _extract_urls(text: str) -> list[str]:
-    standard = re.findall(
-        r'https?://[^\s<>"\')\]]+',
-        text, re.IGNORECASE,
-    )
+def url_risk_score(message: str) -> int:
+    risk = 0
+    for parsed in _extract_urls(message):
+        risk = max(risk, _score_url(parsed))
+    return risk
 
-    no_protocol = re.findall(
-        r'(?:www\.|bit\.ly/|tinyurl\.com/|goo\.gl/|t\.co/)[^\s<>"\')\]]+',
-        text, re.IGNORECASE,
-    )
 
+def _extract_urls(text: str) -> list[ParsedUrl]:
     seen = set()
     urls = []
-    for url in standard + no_protocol:
-        url_clean = url.rstrip(".,;:!?")
-        normalized = re.sub(r'^https?://', '', url_clean.lower())
-        if normalized not in seen:
-            seen.add(normalized)
-            urls.append(url_clean)
+    for match in _URL_RE.finditer(text):
+        body_lower = match.group("body").lower()
+        if body_lower in seen:
+            continue
+        seen.add(body_lower)
+
+        scheme = (match.group("scheme") or "").lower()
+        hostport, slash, path = body_lower.partition("/")
+        host, _, port = hostport.partition(":")
+        urls.append(ParsedUrl(
+            url=match.group(0),
+            lower=f"{scheme}://{body_lower}" if scheme else body_lower,
+            scheme=scheme,
+            host=host,
+            port=port,
+            path=slash + path,
+        ))
 
     return urls
 
 
-def _analyze_single_url(url: str, full_message: str) -> dict:
-    url_lower = url.lower()
-    risk_score = 0
+def _analyze_single_url(parsed: ParsedUrl) -> dict:
+    flags = _url_flags(parsed)
+    shortener, matched_bank, tld, raw_ip, plain_http, path_hits, deep_subdomains = flags
     indicators = []
 
-    for shortener in URL_SHORTENERS:
-        if shortener in url_lower:
-            indicators.append(
-                f"Uses URL shortener ({shortener}) — hides real destination. "
-                f"Banks never use shortened links in official messages."
-            )
-            risk_score += 40
-            break
+    if shortener:
+        indicators.append(
+            f"Uses URL shortener ({shortener[1]}) — hides real destination. "
+            f"Banks never use shortened links in official messages."
+        )
 
-    matched_bank = _check_bank_name_abuse(url_lower)
     if matched_bank:
         indicators.append(
             f"Contains '{matched_bank}' but is NOT an official {matched_bank.upper()} domain. "
-            f"This is a common phishing tactic — using bank names in fake URLs."
+            f"This is a common phishing tactic — using bank and brand names in fake URLs."
         )
-        risk_score += 45
 
-    for tld in SUSPICIOUS_TLDS:
-        if url_lower.endswith(tld) or (tld + "/") in url_lower:
-            indicators.append(
-                f"Uses suspicious domain extension ({tld}). "
-                f"These cheap domains are heavily favored by scammers."
-            )
-            risk_score += 30
-            break
+    if tld:
+        indicators.append(
+            f"Uses suspicious domain extension ({tld[1]}). "
+            f"These cheap domains are heavily favored by scammers."
+        )
 
-    if re.search(r'https?://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', url):
+    if raw_ip:
         indicators.append(
             "URL uses a raw IP address instead of a domain name. "
             "Legitimate banking sites always use proper domain names."
         )
-        risk_score += 45
 
-    if url_lower.startswith("http://"):
+    if plain_http:
         indicators.append(
             "Not using HTTPS (no encryption). "
             "All legitimate banking sites use HTTPS."
         )
-        risk_score += 20
 
-    path_hits = [kw for kw in SUSPICIOUS_PATH_KEYWORDS if kw in url_lower]
     if len(path_hits) >= 2:
         indicators.append(
             f"URL path contains suspicious keywords: {', '.join(path_hits)}. "
             f"Common in phishing URLs designed to look like bank actions."
         )
-        risk_score += 15
 
-    domain_part = _extract_domain(url)
-    if domain_part and domain_part.count(".") >= 3:
+    if deep_subdomains:
         indicators.append(
             "URL has unusually many subdomains — often used to bury "
             "the real domain and make the URL look legitimate."
         )
-        risk_score += 20
 
-    risk_score = min(risk_score, 100)
+    risk_score = _flags_risk(flags)
 
     return {
-        "url": url,
+        "url": parsed.url,
         "risk_score": risk_score,
         "indicators": indicators,
         "is_dangerous": risk_score >= 60,
     }
 
 
-def _check_bank_name_abuse(url_lower: str) -> Optional[str]:
-    domain = _extract_domain(url_lower)
+def _url_flags(parsed: ParsedUrl) -> tuple:
+    return (
+        _SHORTENER_INDEX.longest_match(parsed.host),
+        _check_bank_name_abuse(parsed),
+        _SUSPICIOUS_TLD_INDEX.longest_match(parsed.host),
+        bool(parsed.scheme and _IPV4_HOST_RE.match(parsed.host)),
+        parsed.scheme == "http",
+        [kw for kw in SUSPICIOUS_PATH_KEYWORDS if kw in parsed.lower],
+        bool(parsed.host) and parsed.host.count(".") >= 3,
+    )
+
+
+def _flags_risk(flags: tuple) -> int:
+    shortener, matched_bank, tld, raw_ip, plain_http, path_hits, deep_subdomains = flags
+    risk_score = 0
+    if shortener:
+        risk_score += 40
+    if matched_bank:
+        risk_score += 45
+    if tld:
+        risk_score += 30
+    if raw_ip:
+        risk_score += 45
+    if plain_http:
+        risk_score += 20
+    if len(path_hits) >= 2:
+        risk_score += 15
+    if deep_subdomains:
+        risk_score += 20
+    return min(risk_score, 100)
+
+
+@lru_cache(maxsize=16384)
+def _score_url(parsed: ParsedUrl) -> int:
+    return _flags_risk(_url_flags(parsed))
+
+
+def _check_bank_name_abuse(parsed: ParsedUrl) -> Optional[str]:
+    domain = parsed.host
     if not domain:
         return None
 
-    for bank_name, official_domains in OFFICIAL_BANK_DOMAINS.items():
-        if bank_name in url_lower:
-            is_official = any(
-                domain == official or domain.endswith("." + official)
-                for official in official_domains
-            )
-            if not is_official:
-                return bank_name
+    mentioned = {owner for _, owner in _OWNER_MATCHER.finditer(parsed.lower)}
+    mentioned |= _registrable_tokens(domain) & _TOKEN_OWNERS
+    if not mentioned:
+        return None
+
+    official_for = {owner for _, owner in _OFFICIAL_INDEX.iter_suffix_matches(domain)}
+    for owner in sorted(mentioned, key=_OWNER_ORDER.get):
+        if owner not in official_for:
+            return owner
 
     return None
 
 
-def _extract_domain(url: str) -> Optional[str]:
-    domain = re.sub(r'^https?://', '', url.lower())
-    domain = domain.split('/')[0]
-    domain = domain.split(':')[0]
-    return domain if domain else None
+def _registrable_tokens(host: str) -> set[str]:
+    if _IPV4_HOST_RE.fullmatch(host):
+        return set()
+    labels = [label for label in host.strip(".").split(".") if label]
+    if len(labels) < 2:
+        return set()
+
+    suffix = 1
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        suffix = 2
+    return set(labels[-suffix - 1].split("-"))
 
 
 if __name__ == "__main__":
@@ -207,6 +312,29 @@ if __name__ == "__main__":
         "Your OTP is 483920. Do not share with anyone.",
     ]
 
+    legitimate_urls = [
+        "https://mybucket.s3.amazonaws.com/x",
+        "https://radiobioscience.org/a",
+        "https://www.jiosaavn.com/song",
+    ]
+    for url in legitimate_urls:
+        analysis = analyze_urls(url)["analyses"][0]
+        assert not any("NOT an official" in ind for ind in analysis["indicators"]), (url, analysis)
+        assert not analysis["is_dangerous"], (url, analysis)
+
+    impersonating_urls = {
+        "https://www.icicibank.com.verify-kyc.in/": 80,
+        "https://secure.hdfc.verify-login.com/": 80,
+        "https://hdfcbank-secure.com/login": 60,
+        "https://sbi.kyc-verify-online.com/login": 60,
+        "https://sbionline.xyz/": 75,
+        "http://bit.ly/sbi-kyc-update": 100,
+        "http://192.168.45.12/icici-login": 100,
+    }
+    for url, expected in impersonating_urls.items():
+        analysis = analyze_urls(url)["analyses"][0]
+        assert analysis["risk_score"] == expected, (url, analysis)
+
     for msg in test_messages:
         print(f"\n{'='*60}")
         print(f"Message: {msg[:80]}...")